@@ -1,3 +1,90 @@
+import functools
+
+from collections.abc import Iterable
+from typing import Optional
+
+# the days of the week and their position, shared by the batch engine
+DAYS_OF_WEEK = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+_DAY_INDEXES = {day.lower(): i for i, day in enumerate(DAYS_OF_WEEK)}
+
+# every time of a day in the output format, indexed by minutes since midnight
+_TIMES_OF_DAY = tuple(f"{(minute // 60) % 12 or 12}:{minute % 60:02d} {'AM' if minute < 720 else 'PM'}" for minute in range(1440))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_start(start: str) -> tuple[int, int, str]:
+    """
+    Parse and validate a start time string in the format "HH:MM AM/PM".
+
+    The result is cached, so every distinct start time is parsed only once.
+
+    Returns
+    -------
+    tuple[int, int, str]
+        The hour, the minute and 'AM' or 'PM'.
+
+    Raises
+    ------
+    ValueError
+        If start is not a valid time, as described in add_time.
+    """
+    try:
+        start_hour, rest = start.split(':')
+        start_minute, start_am_pm = rest.split(" ")
+    except ValueError:
+        raise ValueError("start must be in the format 'HH:MM AM/PM'")
+    try:
+        start_hour = int(start_hour)
+        start_minute = int(start_minute)
+    except ValueError:
+        raise ValueError("start hour and minute must be integers")
+
+    # error control
+    if not (1 <= start_hour <= 12):
+        raise ValueError('start hour must be between 1 and 12')
+    if not (0 <= start_minute <= 59):
+        raise ValueError('start minute must be between 0 and 59')
+    if start_am_pm not in ['AM', 'PM']:
+        raise ValueError('start must end with AM or PM')
+
+    return start_hour, start_minute, start_am_pm
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_duration(duration: str) -> tuple[int, int]:
+    """
+    Parse and validate a duration string in the format "HH:MM".
+
+    The result is cached, so every distinct duration is parsed only once.
+
+    Returns
+    -------
+    tuple[int, int]
+        The hours and the minutes.
+
+    Raises
+    ------
+    ValueError
+        If duration is not a valid duration, as described in add_time.
+    """
+    try:
+        duration_hour, duration_minute = duration.split(':')
+    except ValueError:
+        raise ValueError("duration must be in the format 'HH:MM'")
+
+    try:
+        duration_hour = int(duration_hour)
+        duration_minute = int(duration_minute)
+    except ValueError:
+        raise ValueError("duration hours and minutes must be integers")
+
+    # error control
+    if duration_hour < 0 or duration_minute < 0 or duration_minute >= 60:
+        raise ValueError('duration is invalid')
+
+    return duration_hour, duration_minute
+
+
 def add_time(start: str, duration: str, day_of_week: str = '') -> str:
     """
     This function calculates the new time after adding a duration to a start time.
@@ -48,44 +135,12 @@ def add_time(start: str, duration: str, day_of_week: str = '') -> str:
     if day_of_week != '' and day_of_week.lower() not in [day.lower() for day in days_of_week]:
         raise ValueError('the day of the week is wrong')
 
-    # parse start time
-    try:
-         start_hour, rest = start.split(':')
-         start_minute, start_am_pm = rest.split(" ")
-    except ValueError:
-        raise ValueError("start must be in the format 'HH:MM AM/PM'")
-    try:
-        start_hour = int(start_hour)
-        start_minute = int(start_minute)
-    except ValueError:
-        raise ValueError("start hour and minute must be integers")
-
-    # error control
-    if not (1 <= start_hour <= 12):
-        raise ValueError('start hour must be between 1 and 12')
-    if not (0 <= start_minute <= 59):
-        raise ValueError('start minute must be between 0 and 59')
-    if start_am_pm not in ['AM', 'PM']:
-        raise ValueError('start must end with AM or PM')
-
-    # parse duration
-    try:
-        duration_hour, duration_minute = duration.split(':')
-    except ValueError:
-        raise ValueError("duration must be in the format 'HH:MM'")
-
-    try:
-        duration_hour = int(duration_hour)
-        duration_minute = int(duration_minute)
-    except ValueError:
-        raise ValueError("duration hours and minutes must be integers")
+    # parse start time and duration
+    start_hour, start_minute, start_am_pm = _parse_start(start)
+    duration_hour, duration_minute = _parse_duration(duration)
 
-    # error control
-    if duration_hour < 0 or duration_minute < 0 or duration_minute >= 60:
-        raise ValueError('duration is invalid')
-    
     # calculate total hours and minutes
-    final_hour = start_hour + int(duration_hour) + (start_minute + duration_minute) // 60
+    final_hour = start_hour + duration_hour + (start_minute + duration_minute) // 60
     final_minute = (start_minute + duration_minute) % 60
 
     # determine how many 12-hour periods have passed
@@ -126,4 +181,74 @@ def add_time(start: str, duration: str, day_of_week: str = '') -> str:
     # construct final time string
     new_time = f'{str(final_hour)}:{final_minute:02d} {final_am_pm}{final_day_of_week}{day_information}'
 
-    return new_time
\ No newline at end of file
+    return new_time
+
+
+def add_time_batch(starts: Iterable[str], durations: Iterable[str], days_of_week: Optional[Iterable[str]] = None) -> list[str]:
+    """
+    Add many durations to many start times, giving the same results as calling add_time for each of them.
+
+    Every distinct start time and duration is parsed only once, the arithmetic is
+    done on minute offsets and the output is assembled from precomputed tables.
+    Plain sequences and NumPy arrays of strings are accepted.
+
+    Parameters
+    ----------
+    starts : iterable of str
+        Start times in the format "HH:MM AM/PM".
+    durations : iterable of str
+        Durations in the format "HH:MM", one per start time.
+    days_of_week : iterable of str, optional
+        The day of the week of each start time. An empty string omits the day for that entry.
+
+    Returns
+    -------
+    list[str]
+        The new time of each entry, formatted as add_time does.
+
+    Raises
+    ------
+    ValueError
+        If the inputs do not have the same length, or for any invalid input accepted by add_time.
+    """
+    starts = list(starts)
+    durations = list(durations)
+    days_of_week = [''] * len(starts) if days_of_week is None else list(days_of_week)
+    if not len(starts) == len(durations) == len(days_of_week):
+        raise ValueError('starts, durations and days_of_week must have the same length')
+
+    # minutes of every distinct start time and duration seen in this batch
+    start_minutes = {}
+    duration_minutes = {}
+
+    results = []
+    for start, duration, day_of_week in zip(starts, durations, days_of_week):
+        if not isinstance(start, str):
+            raise ValueError('start must be a string')
+        if not isinstance(duration, str):
+            raise ValueError('duration must be a string')
+        if not isinstance(day_of_week, str):
+            raise ValueError('day_of_week must be a string')
+        day_index = _DAY_INDEXES.get(day_of_week.lower()) if day_of_week else None
+        if day_of_week and day_index is None:
+            raise ValueError('the day of the week is wrong')
+
+        # minutes since midnight of the start day, counting the hour as written (12 AM as 12:00) like add_time
+        if start not in start_minutes:
+            start_hour, start_minute, start_am_pm = _parse_start(start)
+            start_minutes[start] = start_hour * 60 + start_minute + (720 if start_am_pm == 'PM' else 0)
+        if duration not in duration_minutes:
+            duration_hour, duration_minute = _parse_duration(duration)
+            duration_minutes[duration] = duration_hour * 60 + duration_minute
+        days_later, minute_of_day = divmod(start_minutes[start] + duration_minutes[duration], 1440)
+
+        new_time = _TIMES_OF_DAY[minute_of_day]
+        if day_index is not None:
+            new_time += f', {DAYS_OF_WEEK[(day_index + days_later) % 7]}'
+        if days_later == 1:
+            new_time += ' (next day)'
+        elif days_later > 1:
+            new_time += f' ({days_later} days later)'
+        results.append(new_time)
+
+    return results
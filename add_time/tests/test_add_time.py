@@ -1,5 +1,5 @@
 import unittest
-from add_time import add_time
+from add_time import add_time, add_time_batch
 
 class TestAddTime(unittest.TestCase):
 
@@ -48,6 +48,22 @@ class TestAddTime(unittest.TestCase):
         expected = '6:18 AM, Monday (20 days later)'
         self.assertEqual(add_time(start, duration, day_of_week), expected)
 
+    def test_add_time_batch(self):
+        starts = ['3:30 PM', '11:55 AM', '2:59 AM', '11:59 PM', '8:16 PM', '12:30 AM']
+        durations = ['2:12', '3:12', '24:00', '24:05', '466:02', '0:10']
+        days = ['Monday', '', 'saturDay', 'Wednesday', 'tuesday', '']
+        expected = [add_time(start, duration, day) for start, duration, day in zip(starts, durations, days)]
+        self.assertEqual(add_time_batch(starts, durations, days), expected)
+        self.assertEqual(add_time_batch(starts, durations), [add_time(start, duration) for start, duration in zip(starts, durations)])
+
+    def test_add_time_batch_errors(self):
+        with self.assertRaises(ValueError):
+            add_time_batch(['3:30 PM'], ['2:12', '1:00'])
+        with self.assertRaises(ValueError):
+            add_time_batch(['3:30 PM'], ['2:60'])
+        with self.assertRaises(ValueError):
+            add_time_batch(['3:30 PM'], ['2:12'], ['Funday'])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,198 @@
+import argparse
+import heapq
+import json
+import random
+import threading
+import time
+import tracemalloc
+
+from typing import Any, Callable, Dict, Optional
+
+from budget_app import Category, ColumnarLedger
+from budget_report import BudgetReport
+
+
+def _fill(category: Category, num_transactions: int) -> None:
+    """
+    Add num_transactions transactions with a few repeated descriptions to a category.
+    """
+    descriptions = ['groceries', 'restaurant', 'transport', 'rent', 'subscriptions']
+    category.deposit(num_transactions * 10, 'initial deposit')
+    for i in range(num_transactions - 1):
+        category.withdraw(1.25 + i % 7, descriptions[i % len(descriptions)])
+
+
+def benchmark_ledger_memory(num_transactions: int, make_ledger: Callable[[], Any]) -> int:
+    """
+    Measure the memory held by a category after adding num_transactions transactions.
+
+    Parameters
+    ----------
+    num_transactions : int
+        The number of transactions to add.
+    make_ledger : callable
+        A function returning the empty ledger to use.
+
+    Returns
+    -------
+    int
+        The number of bytes still allocated once the category is filled.
+    """
+    tracemalloc.start()
+    category = Category('Food', ledger=make_ledger())
+    _fill(category, num_transactions)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def benchmark_memory(num_transactions: int) -> Dict[str, Any]:
+    """
+    Compare the memory used by a list ledger and a ColumnarLedger.
+
+    Parameters
+    ----------
+    num_transactions : int
+        The number of transactions to add to each ledger.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The bytes used by each ledger, per transaction and in total.
+    """
+    list_bytes = benchmark_ledger_memory(num_transactions, list)
+    columnar_bytes = benchmark_ledger_memory(num_transactions, ColumnarLedger)
+    return {
+        'num_transactions': num_transactions,
+        'list_bytes': list_bytes,
+        'columnar_bytes': columnar_bytes,
+        'list_bytes_per_transaction': list_bytes / num_transactions,
+        'columnar_bytes_per_transaction': columnar_bytes / num_transactions,
+        'ratio': list_bytes / columnar_bytes,
+    }
+
+
+def _full_scan_report(categories: list[Category], n: int) -> tuple:
+    """
+    Answer the report queries by scanning every ledger, as the module-level functions do.
+    """
+    withdrawals = {category.category_name: sum(-item['amount'] for item in category.ledger if item['amount'] < 0)
+                   for category in categories}
+    totals_by_description = {}
+    for category in categories:
+        for item in category.ledger:
+            totals_by_description[item['description']] = totals_by_description.get(item['description'], 0) + item['amount']
+    return heapq.nlargest(n, withdrawals.items(), key=lambda item: item[1]), totals_by_description
+
+
+def benchmark_reporting(num_categories: int, transactions_per_category: int, num_queries: int = 10) -> Dict[str, Any]:
+    """
+    Compare answering report queries with a BudgetReport and with full scans of the ledgers.
+
+    Parameters
+    ----------
+    num_categories : int
+        The number of categories.
+    transactions_per_category : int
+        The number of transactions of each category.
+    num_queries : int, optional
+        The number of times the top spenders and totals by description are requested (default is 10).
+
+    Returns
+    -------
+    Dict[str, Any]
+        The seconds spent by each approach and the time needed to build the report.
+    """
+    categories = [Category(f'Category {i}') for i in range(num_categories)]
+    for category in categories:
+        _fill(category, transactions_per_category)
+
+    start = time.perf_counter()
+    for _ in range(num_queries):
+        _full_scan_report(categories, 10)
+    full_scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = BudgetReport(categories)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(num_queries):
+        report.get_top_spenders(10)
+        report.get_totals_by_description()
+    report_seconds = time.perf_counter() - start
+
+    return {
+        'num_categories': num_categories,
+        'transactions_per_category': transactions_per_category,
+        'num_queries': num_queries,
+        'full_scan_seconds': full_scan_seconds,
+        'report_build_seconds': build_seconds,
+        'report_query_seconds': report_seconds,
+    }
+
+
+def benchmark_transfers(num_categories: int, num_threads: int, transfers_per_thread: int = 10_000) -> Dict[str, Any]:
+    """
+    Compare the throughput of concurrent transfers with the category locks and behind one global lock.
+
+    Parameters
+    ----------
+    num_categories : int
+        The number of categories the transfers are made between.
+    num_threads : int
+        The number of threads making transfers at the same time.
+    transfers_per_thread : int, optional
+        The number of transfers made by each thread (default is 10000).
+
+    Returns
+    -------
+    Dict[str, Any]
+        The transfers per second of each approach.
+    """
+    def run(global_lock: Optional[threading.Lock]) -> float:
+        categories = [Category(f'Category {i}') for i in range(num_categories)]
+        for category in categories:
+            category.deposit(transfers_per_thread * num_threads, 'initial deposit')
+
+        def worker(seed: int) -> None:
+            rng = random.Random(seed)
+            for _ in range(transfers_per_thread):
+                source, destination = rng.sample(categories, 2)
+                if global_lock is None:
+                    source.transfer(1, destination)
+                else:
+                    with global_lock:
+                        source.transfer(1, destination)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(num_threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return num_threads * transfers_per_thread / (time.perf_counter() - start)
+
+    return {
+        'num_categories': num_categories,
+        'num_threads': num_threads,
+        'transfers_per_thread': transfers_per_thread,
+        'category_locks_transfers_per_second': run(None),
+        'global_lock_transfers_per_second': run(threading.Lock()),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the budget app and print the results as JSON.')
+    parser.add_argument('--transactions', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--categories', type=int, nargs='+', default=[100, 1_000])
+    parser.add_argument('--transfer-categories', type=int, nargs='+', default=[2, 16, 128])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(json.dumps({
+        'memory': [benchmark_memory(n) for n in args.transactions],
+        'reporting': [benchmark_reporting(n, 1_000) for n in args.categories],
+        'transfers': [benchmark_transfers(categories, threads)
+                      for categories in args.transfer_categories for threads in args.threads],
+    }, indent=2))
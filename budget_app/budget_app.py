@@ -1,4 +1,491 @@
+import asyncio
+import contextlib
+import functools
+import itertools
 import math
+import mmap
+import os
+import struct
+import threading
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import NamedTuple, Optional
+
+
+def _to_cents(amount: float) -> int:
+    """
+    Convert an amount of money to an integer number of cents.
+
+    Parameters
+    ----------
+    amount : float
+        The amount to convert.
+
+    Returns
+    -------
+    int
+        The amount rounded to the nearest cent.
+    """
+    return round(amount * 100)
+
+
+class IngestResult(NamedTuple):
+    """
+    Summary of a bulk ingestion of transactions.
+
+    Attributes
+    ----------
+    accepted : int
+        The number of transactions added to the ledger.
+    rejected : int
+        The number of withdrawals skipped because of insufficient funds.
+    stopped : bool
+        True if the ingestion stopped early at a withdrawal with insufficient funds.
+    """
+    accepted: int
+    rejected: int
+    stopped: bool
+
+
+class _LedgerIndex:
+    """
+    Aggregates of a ledger kept up to date as transactions are added.
+
+    Attributes
+    ----------
+    amounts : array of int
+        The amount of every transaction in cents.
+    prefix_sums : array of int
+        prefix_sums[i] is the sum in cents of the first i transactions.
+    totals_by_description : dict of str to int
+        The sum in cents of the transactions with each description.
+    """
+    def __init__(self, items: Iterable[tuple[int, str]] = ()) -> None:
+        """
+        Initialize a new _LedgerIndex.
+
+        Parameters
+        ----------
+        items : iterable of tuple[int, str], optional
+            The amount in cents and the description of the transactions already in the ledger.
+        """
+        self.amounts = array('q')
+        self.prefix_sums = array('q', [0])
+        self.totals_by_description = {}
+        for cents, description in items:
+            self.append(cents, description)
+
+    def append(self, cents: int, description: str) -> None:
+        """
+        Add a transaction to the aggregates.
+
+        Parameters
+        ----------
+        cents : int
+            The amount of the transaction in cents.
+        description : str
+            The description of the transaction.
+        """
+        self.amounts.append(cents)
+        self.prefix_sums.append(self.prefix_sums[-1] + cents)
+        self.totals_by_description[description] = self.totals_by_description.get(description, 0) + cents
+
+
+class ColumnarLedger(Sequence):
+    """
+    Compact ledger that stores the transactions in columns instead of one dict per transaction.
+
+    The amounts are kept as integer cents in an array and every distinct description
+    is stored only once, with an array of indexes pointing to it. Reading an item
+    returns the same dict as a list ledger, so it can replace one in a Category.
+
+    Amounts are rounded to cents when they are stored.
+    """
+    def __init__(self, items: Iterable[dict] = ()) -> None:
+        """
+        Initialize a new ColumnarLedger.
+
+        Parameters
+        ----------
+        items : iterable of dict, optional
+            Transactions with 'amount' and 'description' keys to store initially.
+        """
+        self._cents = array('q')
+        self._description_indexes = array('I')
+        self._descriptions = []
+        self._description_ids = {}
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        """
+        Return the number of transactions.
+        """
+        return len(self._cents)
+
+    def __getitem__(self, index):
+        """
+        Return the transaction at the given position as a dict, or a list of them for a slice.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {'amount': self._cents[index] / 100, 'description': self._descriptions[self._description_indexes[index]]}
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Iterate over the transactions as dicts.
+        """
+        descriptions = self._descriptions
+        for cents, description_index in zip(self._cents, self._description_indexes):
+            yield {'amount': cents / 100, 'description': descriptions[description_index]}
+
+    def append(self, item: dict) -> None:
+        """
+        Add a transaction at the end of the ledger.
+
+        Parameters
+        ----------
+        item : dict
+            A transaction with 'amount' and 'description' keys.
+        """
+        description = item['description']
+        description_index = self._description_ids.get(description)
+        if description_index is None:
+            description_index = self._description_ids[description] = len(self._descriptions)
+            self._descriptions.append(description)
+
+        self._cents.append(_to_cents(item['amount']))
+        self._description_indexes.append(description_index)
+
+    def extend(self, items: Iterable[dict]) -> None:
+        """
+        Add several transactions at the end of the ledger.
+
+        Parameters
+        ----------
+        items : iterable of dict
+            Transactions with 'amount' and 'description' keys.
+        """
+        for item in items:
+            self.append(item)
+
+
+class FileLedger(Sequence):
+    """
+    Durable ledger stored in an append-only binary log.
+
+    Every transaction is a fixed-size record in `<path>.log` with its amount in cents
+    and the position of its description in `<path>.desc`, where every distinct
+    description is written once, after its length. The number of records and
+    the totals of deposits and withdrawals are saved in the checkpoint `<path>.chk`,
+    so a ledger of any length is reopened without reading its records. The log is
+    memory-mapped for reading, and new transactions are buffered and written
+    together when `group_size` of them are pending or when the ledger is flushed.
+    Pending transactions are also written when the ledger is closed or garbage
+    collected, but only an explicit flush or close guarantees they reach the disk.
+
+    Attributes
+    ----------
+    path : str
+        The common prefix of the files of the ledger.
+    group_size : int
+        The number of pending transactions that triggers a write to disk.
+    """
+    _RECORD = struct.Struct('<qQI')
+    _CHECKPOINT = struct.Struct('<Qqq')
+    _DESCRIPTION_LENGTH = struct.Struct('<I')
+
+    def __init__(self, path: str, group_size: int = 1024) -> None:
+        """
+        Open the ledger stored at path, creating its files if they do not exist.
+
+        Parameters
+        ----------
+        path : str
+            The common prefix of the files of the ledger.
+        group_size : int, optional
+            The number of pending transactions that triggers a write to disk (default is 1024).
+        """
+        self.path = path
+        self.group_size = group_size
+        self._pending = []
+        self._description_positions = {}
+        self._log_map = None
+        self._description_map = None
+
+        self._log = open(path + '.log', 'a+b')
+        self._descriptions = open(path + '.desc', 'a+b')
+        self._load_description_positions()
+
+        # drop a record left incomplete by an interrupted write
+        log_size = os.fstat(self._log.fileno()).st_size
+        self._log.truncate(log_size - log_size % self._RECORD.size)
+        self._flushed = log_size // self._RECORD.size
+
+        checkpointed, self._deposit_cents, self._withdraw_cents = 0, 0, 0
+        if os.path.exists(path + '.chk'):
+            with open(path + '.chk', 'rb') as checkpoint:
+                checkpointed, self._deposit_cents, self._withdraw_cents = self._CHECKPOINT.unpack(checkpoint.read())
+        if checkpointed > self._flushed:
+            checkpointed, self._deposit_cents, self._withdraw_cents = 0, 0, 0
+
+        # replay only the records written after the checkpoint
+        for index in range(checkpointed, self._flushed):
+            self._add_to_totals(self._read_record(index)[0])
+
+    def __enter__(self) -> 'FileLedger':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        """
+        Write the pending transactions of a ledger garbage collected without being closed.
+        """
+        if getattr(self, '_log', None) is not None and not self._log.closed:
+            self.close()
+
+    def _load_description_positions(self) -> None:
+        """
+        Find the position of every description already written, dropping one left incomplete.
+        """
+        self._descriptions.seek(0)
+        data = self._descriptions.read()
+        offset = 0
+        while offset + self._DESCRIPTION_LENGTH.size <= len(data):
+            (length,) = self._DESCRIPTION_LENGTH.unpack_from(data, offset)
+            start = offset + self._DESCRIPTION_LENGTH.size
+            if start + length > len(data):
+                break
+            self._description_positions[data[start:start + length].decode()] = (start, length)
+            offset = start + length
+        self._descriptions.truncate(offset)
+
+    def __len__(self) -> int:
+        """
+        Return the number of transactions, including the ones not written yet.
+        """
+        return self._flushed + len(self._pending)
+
+    def __getitem__(self, index):
+        """
+        Return the transaction at the given position as a dict, or a list of them for a slice.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('ledger index out of range')
+
+        if index >= self._flushed:
+            cents, description = self._pending[index - self._flushed]
+        else:
+            cents, offset, length = self._read_record(index)
+            description = self._read_description(offset, length)
+        return {'amount': cents / 100, 'description': description}
+
+    def _read_record(self, index: int) -> tuple[int, int, int]:
+        """
+        Read the amount and the description position of a written transaction.
+        """
+        if self._log_map is None or len(self._log_map) < (index + 1) * self._RECORD.size:
+            if self._log_map is not None:
+                self._log_map.close()
+            self._log_map = mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._RECORD.unpack_from(self._log_map, index * self._RECORD.size)
+
+    def _read_description(self, offset: int, length: int) -> str:
+        """
+        Read a description from the descriptions file.
+        """
+        if length == 0:
+            return ''
+        if self._description_map is None or len(self._description_map) < offset + length:
+            if self._description_map is not None:
+                self._description_map.close()
+            self._description_map = mmap.mmap(self._descriptions.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._description_map[offset:offset + length].decode()
+
+    def _add_to_totals(self, cents: int) -> None:
+        """
+        Update the totals of deposits and withdrawals with the amount of a transaction.
+        """
+        if cents < 0:
+            self._withdraw_cents -= cents
+        else:
+            self._deposit_cents += cents
+
+    def totals(self) -> tuple[int, int]:
+        """
+        Get the totals of the ledger without reading its transactions.
+
+        Returns
+        -------
+        tuple[int, int]
+            The total deposits and the total withdrawals (absolute value), in cents.
+        """
+        return self._deposit_cents, self._withdraw_cents
+
+    def append(self, item: dict) -> None:
+        """
+        Add a transaction at the end of the ledger.
+
+        Parameters
+        ----------
+        item : dict
+            A transaction with 'amount' and 'description' keys.
+        """
+        cents = _to_cents(item['amount'])
+        self._pending.append((cents, item['description']))
+        self._add_to_totals(cents)
+        if len(self._pending) >= self.group_size:
+            self.flush()
+
+    def extend(self, items: Iterable[dict]) -> None:
+        """
+        Add several transactions at the end of the ledger.
+
+        Parameters
+        ----------
+        items : iterable of dict
+            Transactions with 'amount' and 'description' keys.
+        """
+        for item in items:
+            self.append(item)
+
+    def flush(self) -> None:
+        """
+        Write the pending transactions and the checkpoint to disk.
+
+        The descriptions are written before the records and the records before the
+        checkpoint, so an interrupted flush never leaves a checkpoint ahead of the log.
+        """
+        if not self._pending:
+            return
+
+        descriptions_end = os.fstat(self._descriptions.fileno()).st_size
+        new_descriptions = bytearray()
+        records = bytearray()
+        for cents, description in self._pending:
+            position = self._description_positions.get(description)
+            if position is None:
+                encoded = description.encode()
+                new_descriptions += self._DESCRIPTION_LENGTH.pack(len(encoded))
+                position = self._description_positions[description] = (descriptions_end + len(new_descriptions), len(encoded))
+                new_descriptions += encoded
+            records += self._RECORD.pack(cents, *position)
+
+        for file, data in ((self._descriptions, new_descriptions), (self._log, records)):
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self._flushed += len(self._pending)
+        self._pending = []
+
+        with open(self.path + '.chk.tmp', 'wb') as checkpoint:
+            checkpoint.write(self._CHECKPOINT.pack(self._flushed, self._deposit_cents, self._withdraw_cents))
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(self.path + '.chk.tmp', self.path + '.chk')
+
+    def close(self) -> None:
+        """
+        Flush the pending transactions and close the files of the ledger.
+        """
+        self.flush()
+        for file_map in (self._log_map, self._description_map):
+            if file_map is not None:
+                file_map.close()
+        self._log.close()
+        self._descriptions.close()
+
+
+# gives every category a position in the order its lock is acquired
+_category_ids = itertools.count()
+
+
+@contextlib.contextmanager
+def _lock_categories(categories: Iterable['Category']) -> Iterator[None]:
+    """
+    Hold the locks of several categories, acquired in a fixed order to avoid deadlocks.
+
+    Parameters
+    ----------
+    categories : iterable of Category
+        The categories to lock. Repeated categories are locked once.
+    """
+    with contextlib.ExitStack() as stack:
+        for category in sorted({id(category): category for category in categories}.values(), key=lambda category: category._order):
+            stack.enter_context(category._lock)
+        yield
+
+
+class CategorySnapshot:
+    """
+    Read-only view of a category as it was at a given version.
+
+    The ledger and the prefix sums of a category are only ever appended to, so a
+    snapshot shares them with the category instead of copying them, and keeps seeing
+    the same transactions while new ones are added.
+
+    Attributes
+    ----------
+    category : Category
+        The category the snapshot was taken from.
+    version : int
+        The number of transactions included in the snapshot.
+    """
+    def __init__(self, category: 'Category', version: int) -> None:
+        """
+        Initialize a new CategorySnapshot.
+
+        Parameters
+        ----------
+        category : Category
+            The category the snapshot is taken from.
+        version : int
+            The number of transactions included in the snapshot.
+        """
+        self.category = category
+        self.version = version
+        self._prefix_sums = category._get_index().prefix_sums
+
+    def __len__(self) -> int:
+        """
+        Return the number of transactions in the snapshot.
+        """
+        return self.version
+
+    def __getitem__(self, index: int) -> dict:
+        """
+        Return the transaction at the given position of the snapshot.
+        """
+        if index < 0:
+            index += self.version
+        if not 0 <= index < self.version:
+            raise IndexError('snapshot index out of range')
+        return self.category.ledger[index]
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Iterate over the transactions of the snapshot.
+        """
+        return itertools.islice(iter(self.category.ledger), self.version)
+
+    def get_balance(self) -> float:
+        """
+        Get the balance of the category at the version of the snapshot.
+
+        Returns
+        -------
+        float
+            The sum of the transactions in the snapshot.
+        """
+        return self._prefix_sums[self.version] / 100
+
 
 class Category:
     """
@@ -8,10 +495,23 @@ class Category:
     ----------
     category_name : str
         Name of the category.
-    ledger : list of dict
+    ledger : list of dict, ColumnarLedger or FileLedger
         List of transactions (deposits and withdrawals) in the category.
+
+    The balance and the totals of deposits and withdrawals are kept as integer cents
+    and updated with every transaction, so they are exact and can be read without
+    going through the ledger. The aggregate queries use prefix sums that are built
+    the first time they are needed and then updated with every transaction.
+
+    Every category has its own lock, so transactions and transfers can be made from
+    several threads at the same time.
+
+    The ledger should only be changed through the methods of the category.
+    Transactions appended to it directly are added to the totals the next time the
+    category is used, and removing transactions makes the totals be recomputed from
+    the ledger, but transactions changed in place are not detected.
     """
-    def __init__(self, category_name: str) -> None:
+    def __init__(self, category_name: str, ledger: Optional[Sequence] = None) -> None:
         """
         Initialize a new Category.
 
@@ -19,9 +519,48 @@ class Category:
         ----------
         category_name : str
             The name of the category.
+        ledger : list of dict, ColumnarLedger or FileLedger, optional
+            The storage for the transactions (default is a new list). A ColumnarLedger
+            uses much less memory for large ledgers, and a FileLedger keeps them on disk;
+            close or flush a FileLedger when done with the category, since up to its
+            group_size latest transactions are only kept in memory until then.
         """
         self.category_name = category_name
-        self.ledger = []
+        self.ledger = [] if ledger is None else ledger
+        self._balance_cents = 0
+        self._deposit_cents = 0
+        self._withdraw_cents = 0
+        self._index = None
+        self._observers = []
+        self._lock = threading.RLock()
+        self._order = next(_category_ids)
+
+        if isinstance(self.ledger, FileLedger):
+            self._deposit_cents, self._withdraw_cents = self.ledger.totals()
+            self._balance_cents = self._deposit_cents - self._withdraw_cents
+        else:
+            for item in self.ledger:
+                self._add_to_totals(_to_cents(item['amount']))
+        # the number of transactions of the ledger included in the totals
+        self._recorded = len(self.ledger)
+
+    def _sync(self) -> None:
+        """
+        Bring the totals up to date with transactions added to or removed from the ledger directly.
+        """
+        if len(self.ledger) == self._recorded:
+            return
+        with self._lock:
+            size = len(self.ledger)
+            if size > self._recorded:
+                for item in self.ledger[self._recorded:size]:
+                    self._record(_to_cents(item['amount']), item['description'])
+            elif size < self._recorded:
+                self._balance_cents = self._deposit_cents = self._withdraw_cents = 0
+                for item in self.ledger:
+                    self._add_to_totals(_to_cents(item['amount']))
+                self._index = None
+            self._recorded = size
 
     def __str__(self) -> str:
         """
@@ -60,8 +599,155 @@ class Category:
         description : str, optional
             A description of the deposit (default is an empty string).
         """
+        with self._lock:
+            self._append(amount, description)
+
+    def _append(self, amount: float, description: str, counterpart: Optional['Category'] = None) -> None:
+        """
+        Add a transaction to the ledger and update the running totals.
+
+        Parameters
+        ----------
+        amount : float
+            The amount of the transaction (negative for withdrawals).
+        description : str
+            A description of the transaction.
+        counterpart : Category, optional
+            The other category of a transfer.
+        """
+        self._sync()
         self.ledger.append({'amount': amount, 'description': description})
-    
+        self._recorded += 1
+        self._record(_to_cents(amount), description, counterpart)
+
+    def _record(self, cents: int, description: str, counterpart: Optional['Category'] = None) -> None:
+        """
+        Update the running totals, the aggregates and the subscribers with a new transaction.
+
+        Parameters
+        ----------
+        cents : int
+            The amount of the transaction in cents (negative for withdrawals).
+        description : str
+            A description of the transaction.
+        counterpart : Category, optional
+            The other category of a transfer.
+        """
+        self._add_to_totals(cents)
+        if self._index is not None:
+            self._index.append(cents, description)
+        for observer in self._observers:
+            observer(self, cents, description, counterpart)
+
+    def subscribe(self, observer: Callable[['Category', int, str, Optional['Category']], None]) -> None:
+        """
+        Register a function to be called after every transaction of the category.
+
+        Parameters
+        ----------
+        observer : callable
+            Called with the category, the amount in cents, the description and, for
+            transfers, the other category (None otherwise).
+        """
+        with self._lock:
+            self._observers.append(observer)
+
+    def _add_to_totals(self, cents: int) -> None:
+        """
+        Update the running totals with the amount of a transaction.
+
+        Parameters
+        ----------
+        cents : int
+            The amount of the transaction in cents (negative for withdrawals).
+        """
+        self._balance_cents += cents
+        if cents < 0:
+            self._withdraw_cents -= cents
+        else:
+            self._deposit_cents += cents
+
+    def _get_index(self) -> _LedgerIndex:
+        """
+        Return the aggregates of the ledger, building them the first time they are needed.
+        """
+        with self._lock:
+            self._sync()
+            if self._index is None:
+                self._index = _LedgerIndex((_to_cents(item['amount']), item['description']) for item in self.ledger)
+            return self._index
+
+    def ingest(self, records: Iterable[tuple[float, str]], on_overdraft: str = 'reject', on_row: Optional[Callable[[int, bool], None]] = None, batch_size: int = 10_000) -> IngestResult:
+        """
+        Add many transactions to the ledger in a single pass.
+
+        Positive amounts are deposits and negative amounts are withdrawals. The
+        balance is checked as the records are read and the accepted transactions are
+        added to the ledger in batches, so records can be streamed from a file of any
+        size with constant extra memory. If reading the records raises an exception,
+        the transactions accepted before it stay in the ledger.
+
+        Parameters
+        ----------
+        records : iterable of tuple[float, str]
+            The amount and the description of each transaction.
+        on_overdraft : str, optional
+            What to do with a withdrawal larger than the balance: 'reject' skips it (default),
+            'stop' ends the ingestion and 'allow' adds it anyway.
+        on_row : callable, optional
+            Called with the position of every record read and whether it was added to the ledger,
+            including the record that stopped the ingestion.
+        batch_size : int, optional
+            The number of transactions added to the ledger at once (default is 10000).
+
+        Returns
+        -------
+        IngestResult
+            The number of accepted and rejected transactions and whether the ingestion stopped early.
+
+        Raises
+        ------
+        ValueError
+            If on_overdraft is not 'reject', 'stop' or 'allow'.
+        """
+        if on_overdraft not in ('reject', 'stop', 'allow'):
+            raise ValueError("on_overdraft must be 'reject', 'stop' or 'allow'")
+
+        with self._lock:
+            self._sync()
+            accepted = 0
+            rejected = 0
+            stopped = False
+            batch = []
+            try:
+                for row, (amount, description) in enumerate(records):
+                    cents = _to_cents(amount)
+                    if cents < 0 and -cents > self._balance_cents and on_overdraft != 'allow':
+                        if on_row is not None:
+                            on_row(row, False)
+                        if on_overdraft == 'stop':
+                            stopped = True
+                            break
+                        rejected += 1
+                        continue
+
+                    batch.append({'amount': amount, 'description': description})
+                    self._record(cents, description)
+                    accepted += 1
+                    if on_row is not None:
+                        on_row(row, True)
+
+                    if len(batch) >= batch_size:
+                        self.ledger.extend(batch)
+                        self._recorded += len(batch)
+                        batch = []
+            finally:
+                # The accepted transactions are already in the totals, so they reach the
+                # ledger even if reading the records fails.
+                self.ledger.extend(batch)
+                self._recorded += len(batch)
+            return IngestResult(accepted, rejected, stopped)
+
     def withdraw(self, amount: float, description: str='') -> bool:
         """
         Withdraw an amount from the ledger if sufficient funds are available.
@@ -78,21 +764,23 @@ class Category:
         bool
             True if the withdrawal was successful, False otherwise.
         """
-        if not self.check_funds(amount):
-            return False
-        self.ledger.append({'amount': -amount, 'description': description})
-        return True
+        with self._lock:
+            if not self.check_funds(amount):
+                return False
+            self._append(-amount, description)
+            return True
     
     def get_balance(self) -> float:
         """
-        Calculate the current balance of the category.
+        Get the current balance of the category.
 
         Returns
         -------
         float
             The total balance (sum of all deposits and withdrawals).
         """
-        return sum(item['amount'] for item in self.ledger)
+        self._sync()
+        return self._balance_cents / 100
     
     def transfer(self, amount: float, budget_category: 'Category') -> bool:
         """
@@ -110,11 +798,32 @@ class Category:
         bool
             True if the transfer was successful, False otherwise.
         """
-        if not self.check_funds(amount):
-            return False
-        self.withdraw(amount, f'Transfer to {budget_category.category_name}')
-        budget_category.deposit(amount, f'Transfer from {self.category_name}')
-        return True
+        with _lock_categories([self, budget_category]):
+            if not self.check_funds(amount):
+                return False
+            self._append(-amount, f'Transfer to {budget_category.category_name}', budget_category)
+            budget_category._append(amount, f'Transfer from {self.category_name}', self)
+            return True
+
+    async def transfer_async(self, amount: float, budget_category: 'Category') -> bool:
+        """
+        Transfer an amount to another category without blocking the event loop.
+
+        The transfer waits for the locks of both categories in a worker thread.
+
+        Parameters
+        ----------
+        amount : float
+            The amount to transfer.
+        budget_category : Category
+            The destination category.
+
+        Returns
+        -------
+        bool
+            True if the transfer was successful, False otherwise.
+        """
+        return await asyncio.to_thread(self.transfer, amount, budget_category)
 
     def check_funds(self, amount: float) -> bool:
         """
@@ -130,18 +839,184 @@ class Category:
         bool
             True if there are enough funds, False otherwise.
         """
-        return amount <= self.get_balance()
+        self._sync()
+        return _to_cents(amount) <= self._balance_cents
 
     def get_total_withdraw(self) -> float:
         """
-        Calculate the total amount withdrawn from the category.
+        Get the total amount withdrawn from the category.
 
         Returns
         -------
         float
             The sum of all withdrawals (absolute value).
         """
-        return sum(-item['amount'] for item in self.ledger if item['amount'] < 0)
+        self._sync()
+        return self._withdraw_cents / 100
+
+    def get_total_deposit(self) -> float:
+        """
+        Get the total amount deposited into the category.
+
+        Returns
+        -------
+        float
+            The sum of all deposits.
+        """
+        self._sync()
+        return self._deposit_cents / 100
+
+    def get_total(self, start: int = 0, stop: Optional[int] = None) -> float:
+        """
+        Get the sum of the transactions in a range of positions of the ledger.
+
+        Parameters
+        ----------
+        start : int, optional
+            The position of the first transaction included (default is 0).
+        stop : int, optional
+            The position after the last transaction included (default is the end of the ledger).
+            Negative positions count from the end, as in a slice.
+
+        Returns
+        -------
+        float
+            The sum of the transactions in the range.
+        """
+        prefix_sums = self._get_index().prefix_sums
+        start, stop, _ = slice(start, stop).indices(len(prefix_sums) - 1)
+        return (prefix_sums[max(start, stop)] - prefix_sums[start]) / 100
+
+    def get_version(self) -> int:
+        """
+        Get the version of the category, which is the number of transactions made.
+
+        Returns
+        -------
+        int
+            The number of transactions in the ledger.
+        """
+        return len(self.ledger)
+
+    def get_balance_at(self, version: int) -> float:
+        """
+        Get the balance of the category just after a given number of transactions.
+
+        Parameters
+        ----------
+        version : int
+            The number of transactions included, between 0 and the current version.
+
+        Returns
+        -------
+        float
+            The balance at that version.
+
+        Raises
+        ------
+        ValueError
+            If the version is negative or greater than the current version.
+        """
+        prefix_sums = self._get_index().prefix_sums
+        if not 0 <= version < len(prefix_sums):
+            raise ValueError('version must be between 0 and the number of transactions')
+        return prefix_sums[version] / 100
+
+    def snapshot(self) -> CategorySnapshot:
+        """
+        Take a read-only view of the category at its current version.
+
+        Returns
+        -------
+        CategorySnapshot
+            A snapshot that is not affected by later transactions.
+        """
+        with self._lock:
+            return CategorySnapshot(self, len(self.ledger))
+
+    def get_min_amount(self, start: int = 0, stop: Optional[int] = None) -> Optional[float]:
+        """
+        Get the smallest transaction in a range of positions of the ledger.
+
+        Parameters
+        ----------
+        start : int, optional
+            The position of the first transaction included (default is 0).
+        stop : int, optional
+            The position after the last transaction included (default is the end of the ledger).
+
+        Returns
+        -------
+        float or None
+            The smallest amount in the range, or None if the range is empty.
+        """
+        amounts = self._get_index().amounts[start:stop]
+        return min(amounts) / 100 if amounts else None
+
+    def get_max_amount(self, start: int = 0, stop: Optional[int] = None) -> Optional[float]:
+        """
+        Get the largest transaction in a range of positions of the ledger.
+
+        Parameters
+        ----------
+        start : int, optional
+            The position of the first transaction included (default is 0).
+        stop : int, optional
+            The position after the last transaction included (default is the end of the ledger).
+
+        Returns
+        -------
+        float or None
+            The largest amount in the range, or None if the range is empty.
+        """
+        amounts = self._get_index().amounts[start:stop]
+        return max(amounts) / 100 if amounts else None
+
+    def get_totals_by_description(self) -> dict[str, float]:
+        """
+        Get the sum of the transactions with each description.
+
+        Returns
+        -------
+        dict[str, float]
+            A dictionary with the descriptions as keys and the sum of their transactions as values.
+        """
+        return {description: cents / 100 for description, cents in self._get_index().totals_by_description.items()}
+
+def transfer_many(transfers: list[tuple[Category, Category, float]]) -> bool:
+    """
+    Make several transfers between categories as a single atomic operation.
+
+    The locks of every category involved are held while the transfers are checked
+    and made, so either all the transfers succeed or none of them is made.
+
+    Parameters
+    ----------
+    transfers : list of tuple[Category, Category, float]
+        The source category, the destination category and the amount of each transfer,
+        applied in order.
+
+    Returns
+    -------
+    bool
+        True if all the transfers were made, False if any of them lacked funds.
+    """
+    categories = [category for source, destination, _ in transfers for category in (source, destination)]
+    with _lock_categories(categories):
+        for category in categories:
+            category._sync()
+        balances = {id(category): category._balance_cents for category in categories}
+        for source, destination, amount in transfers:
+            cents = _to_cents(amount)
+            if cents > balances[id(source)]:
+                return False
+            balances[id(source)] -= cents
+            balances[id(destination)] += cents
+
+        for source, destination, amount in transfers:
+            source.transfer(amount, destination)
+        return True
+
 
 def calculate_totals(categories: list[Category]) -> dict[str, float]:
     """
@@ -180,6 +1055,32 @@ def calculate_percentages(categories: list[Category]) -> dict[str, int]:
     total = sum(totals.values())
     return {k: math.floor(v / total * 100 / 10) * 10 for k, v in totals.items()}
     
+def _chart_lines(percentages: tuple[int, ...]) -> list[str]:
+    """
+    Generate the main lines of the spending chart from the percentage of each bar.
+    """
+    lines = []
+    for level in range(100, -1, -10):
+        lines.append(f'{level:>3}| ' + ''.join(['o  ' if percentage >= level else '   ' for percentage in percentages]))
+    lines.append('    -' + '---' * len(percentages))
+    return lines
+
+
+def _label_lines(names: tuple[str, ...]) -> list[str]:
+    """
+    Generate the label lines of the spending chart, writing every name vertically.
+    """
+    return ['     ' + '  '.join(letters) + '  ' for letters in itertools.zip_longest(*names, fillvalue=' ')]
+
+
+@functools.lru_cache(maxsize=256)
+def _render_spend_chart(names: tuple[str, ...], percentages: tuple[int, ...]) -> str:
+    """
+    Render the spending chart, reusing the previous render when the names and percentages have not changed.
+    """
+    return '\n'.join(['Percentage spent by category'] + _chart_lines(percentages) + _label_lines(names))
+
+
 def generate_chart_lines(categories_withdraw: dict[str, int], categories: list[Category]) -> list[str]:
     """
     Generate the main lines of the spending chart.
@@ -196,13 +1097,7 @@ def generate_chart_lines(categories_withdraw: dict[str, int], categories: list[C
     list[str]
         Each element is a line of the chart showing the 'o' markers.
     """
-    lines = []
-    for i in range(10, -1, -1):
-        line = f'{str(i*10).rjust(3)}| '
-        line += ''.join(['o  ' if categories_withdraw[category.category_name] >= i * 10 else '   ' for category in categories])
-        lines.append(line)
-    lines.append(f"    -{'---' * len(categories)}")
-    return lines
+    return _chart_lines(tuple(categories_withdraw[category.category_name] for category in categories))
 
 def generate_labels(categories: list[Category]) -> list[str]:
     """
@@ -218,15 +1113,16 @@ def generate_labels(categories: list[Category]) -> list[str]:
     list[str]        
         Each element is a line of the chart.
     """
-    lines = []
-    for i in range(max([len(category.category_name) for category in categories])):
-            lines.append('     ' + '  '.join([category.category_name[i] if i < len(category.category_name) else ' ' for category in categories]) + '  ')
-    return lines
+    return _label_lines(tuple(category.category_name for category in categories))
 
 def create_spend_chart(categories: list[Category]) -> str:
     """
     Create a bar chart showing the percentage spent by category.
 
+    The totals of every category are kept up to date by its transactions, so the
+    cost of a chart does not depend on the length of the ledgers, and a chart whose
+    names and percentages have not changed since a previous call is not rendered again.
+
     Parameters
     ----------
     categories : list of Category
@@ -240,8 +1136,6 @@ def create_spend_chart(categories: list[Category]) -> str:
 
     categories_withdraw = calculate_percentages(categories)
 
-    lines = ['Percentage spent by category']
-
-    lines += generate_chart_lines(categories_withdraw, categories) + generate_labels(categories)
+    names = tuple(category.category_name for category in categories)
 
-    return '\n'.join(lines)
\ No newline at end of file
+    return _render_spend_chart(names, tuple(categories_withdraw[name] for name in names))
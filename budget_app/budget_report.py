@@ -0,0 +1,155 @@
+import heapq
+import math
+import threading
+
+from collections.abc import Iterable
+from typing import Optional
+
+from budget_app import Category, _to_cents
+
+_TRANSFER_PREFIX = 'Transfer to '
+
+
+def _transfer_destination(description: str) -> Optional[str]:
+    """
+    Get the name of the category a 'Transfer to' description sends money to, or None.
+    """
+    if description.startswith(_TRANSFER_PREFIX):
+        return description[len(_TRANSFER_PREFIX):]
+    return None
+
+
+class BudgetReport:
+    """
+    Reports over many categories, kept up to date as transactions are made.
+
+    The report scans the ledger of every category once when it is added, and from
+    then on subscribes to its transactions, so answering a query never goes through
+    the ledgers again.
+
+    Attributes
+    ----------
+    categories : list of Category
+        The categories included in the report.
+    """
+    def __init__(self, categories: Iterable[Category] = ()) -> None:
+        """
+        Initialize a new BudgetReport.
+
+        Parameters
+        ----------
+        categories : iterable of Category, optional
+            The categories to include in the report.
+        """
+        self.categories = []
+        self._totals_by_description = {}
+        self._transfers = {}
+        self._lock = threading.Lock()
+        for category in categories:
+            self.add(category)
+
+    def add(self, category: Category) -> None:
+        """
+        Include a category in the report.
+
+        Transfers are recognised by the counterpart the category reports or, when there
+        is none (the transactions already in its ledger and the ones added by ingest),
+        by their 'Transfer to' description.
+
+        Parameters
+        ----------
+        category : Category
+            The category to include.
+        """
+        with category._lock:
+            for item in category.ledger:
+                description = item['description']
+                self._add_transaction(category.category_name, _to_cents(item['amount']), description, _transfer_destination(description))
+            category.subscribe(self._on_transaction)
+            self.categories.append(category)
+
+    def _on_transaction(self, category: Category, cents: int, description: str, counterpart: Optional[Category]) -> None:
+        """
+        Update the report with a transaction made by one of its categories.
+        """
+        if counterpart is not None:
+            counterpart_name = counterpart.category_name
+        else:
+            counterpart_name = _transfer_destination(description)
+        self._add_transaction(category.category_name, cents, description, counterpart_name)
+
+    def _add_transaction(self, category_name: str, cents: int, description: str, counterpart_name: Optional[str]) -> None:
+        """
+        Add a transaction to the totals by description and, for outgoing transfers, to the transfers.
+        """
+        with self._lock:
+            self._totals_by_description[description] = self._totals_by_description.get(description, 0) + cents
+            if counterpart_name is not None and cents < 0:
+                edge = (category_name, counterpart_name)
+                self._transfers[edge] = self._transfers.get(edge, 0) - cents
+
+    def get_top_spenders(self, n: int) -> list[tuple[str, float]]:
+        """
+        Get the categories with the largest total withdrawals.
+
+        Parameters
+        ----------
+        n : int
+            The number of categories to return.
+
+        Returns
+        -------
+        list[tuple[str, float]]
+            The name and the total withdrawals of each category, from the largest.
+        """
+        for category in self.categories:
+            category._sync()
+        top = heapq.nlargest(n, self.categories, key=lambda category: category._withdraw_cents)
+        return [(category.category_name, category.get_total_withdraw()) for category in top]
+
+    def get_spending_percentiles(self, percentiles: Iterable[float] = (50, 90, 99)) -> dict[float, float]:
+        """
+        Get percentiles of the total withdrawals of the categories.
+
+        Parameters
+        ----------
+        percentiles : iterable of float, optional
+            The percentiles to compute, between 0 and 100 (default is 50, 90 and 99).
+
+        Returns
+        -------
+        dict[float, float]
+            A dictionary with the percentiles as keys and the total withdrawals at that
+            percentile (nearest rank) as values.
+        """
+        for category in self.categories:
+            category._sync()
+        totals = sorted(category._withdraw_cents for category in self.categories)
+        if not totals:
+            return {}
+        return {percentile: totals[max(0, math.ceil(percentile / 100 * len(totals)) - 1)] / 100 for percentile in percentiles}
+
+    def get_totals_by_description(self) -> dict[str, float]:
+        """
+        Get the sum of the transactions with each description across all the categories.
+
+        Returns
+        -------
+        dict[str, float]
+            A dictionary with the descriptions as keys and the sum of their transactions as values.
+        """
+        with self._lock:
+            return {description: cents / 100 for description, cents in self._totals_by_description.items()}
+
+    def get_transfers(self) -> dict[tuple[str, str], float]:
+        """
+        Get the total amount transferred between every pair of categories.
+
+        Returns
+        -------
+        dict[tuple[str, str], float]
+            A dictionary with the names of the source and destination categories as keys
+            and the total amount transferred from the first to the second as values.
+        """
+        with self._lock:
+            return {edge: cents / 100 for edge, cents in self._transfers.items()}
@@ -1,5 +1,11 @@
+import asyncio
+import gc
+import os
+import random
+import tempfile
+import threading
 import unittest
-from budget_app import Category, create_spend_chart
+from budget_app import Category, ColumnarLedger, FileLedger, create_spend_chart, transfer_many
 
 class TestBudgetApp(unittest.TestCase):
 
@@ -44,6 +50,234 @@ class TestBudgetApp(unittest.TestCase):
         self.food.withdraw(50, "restaurant")
         self.assertEqual(self.food.get_total_withdraw(), 150)
 
+    def test_running_totals_match_ledger(self):
+        self.food.deposit(1000, "initial deposit")
+        self.food.withdraw(10.15, "groceries")
+        self.food.withdraw(5000, "too expensive")
+        self.food.transfer(50, self.clothing)
+        self.assertEqual(self.food.get_balance(), 939.85)
+        self.assertEqual(self.food.get_total_deposit(), 1000)
+        self.assertEqual(self.food.get_total_withdraw(), 10.15 + 50)
+        self.assertEqual(self.clothing.get_total_deposit(), 50)
+
+    def test_ledger_changed_directly(self):
+        self.food.deposit(100, "deposit")
+        self.food.ledger.append({'amount': 5, 'description': 'x'})
+        self.assertEqual(self.food.get_balance(), 105)
+        self.assertEqual(str(self.food).splitlines()[-1], 'Total: 105.00')
+        self.assertEqual(self.food.get_total(), 105)
+        self.assertEqual(self.food.get_balance_at(self.food.get_version()), 105)
+        self.food.ledger.append({'amount': -20, 'description': 'y'})
+        self.food.deposit(1, "refund")
+        self.assertEqual(self.food.get_total_withdraw(), 20)
+        self.assertEqual(self.food.get_balance(), 86)
+        del self.food.ledger[1:3]
+        self.assertEqual(self.food.get_balance(), 101)
+        self.assertEqual(self.food.get_total(), 101)
+        self.assertEqual(self.food.get_totals_by_description(), {"deposit": 100, "refund": 1})
+
+    def test_columnar_ledger(self):
+        food = Category("Food", ledger=ColumnarLedger())
+        food.deposit(1000, "initial deposit")
+        food.withdraw(10.15, "groceries")
+        food.withdraw(15.89, "groceries")
+        self.assertEqual(len(food.ledger), 3)
+        self.assertEqual(food.ledger[1], {'amount': -10.15, 'description': 'groceries'})
+        self.assertEqual(list(food.ledger)[2], {'amount': -15.89, 'description': 'groceries'})
+        self.assertEqual(len(food.ledger._descriptions), 2)
+        self.assertEqual(str(food).splitlines()[-1], 'Total: 973.96')
+
+    def test_category_from_existing_ledger(self):
+        ledger = ColumnarLedger([{'amount': 100, 'description': 'deposit'}, {'amount': -40, 'description': 'rent'}])
+        category = Category("Home", ledger=ledger)
+        self.assertEqual(category.get_balance(), 60)
+        self.assertEqual(category.get_total_withdraw(), 40)
+
+    def test_exact_cents(self):
+        for _ in range(1000):
+            self.food.deposit(0.1)
+        for _ in range(300):
+            self.food.withdraw(0.1)
+        self.assertEqual(self.food.get_balance(), 70)
+        self.assertEqual(self.food.get_total_withdraw(), 30)
+        self.assertTrue(self.food.check_funds(70))
+
+    def test_aggregates(self):
+        self.food.deposit(1000, "initial deposit")
+        self.food.withdraw(10.15, "groceries")
+        self.food.withdraw(100, "restaurant")
+        self.assertEqual(self.food.get_total(1), -110.15)
+        self.food.withdraw(15.89, "groceries")
+        self.assertEqual(self.food.get_total(), self.food.get_balance())
+        self.assertEqual(self.food.get_total(1, 3), -110.15)
+        self.assertEqual(self.food.get_total(-2), -115.89)
+        self.assertEqual(self.food.get_total(3, 1), 0)
+        self.assertEqual(self.food.get_min_amount(), -100)
+        self.assertEqual(self.food.get_max_amount(1), -10.15)
+        self.assertIsNone(self.food.get_max_amount(4))
+        self.assertEqual(self.food.get_totals_by_description(),
+                         {"initial deposit": 1000, "groceries": -26.04, "restaurant": -100})
+
+    def test_ingest(self):
+        outcomes = []
+        records = [(100, "deposit"), (-30.5, "groceries"), (-500, "car"), (-20, "restaurant")]
+        result = self.food.ingest(records, on_row=lambda row, accepted: outcomes.append((row, accepted)), batch_size=2)
+        self.assertEqual(result, (3, 1, False))
+        self.assertEqual(outcomes, [(0, True), (1, True), (2, False), (3, True)])
+        self.assertEqual(self.food.get_balance(), 49.5)
+        self.assertEqual(self.food.ledger[-1], {'amount': -20, 'description': 'restaurant'})
+
+    def test_ingest_overdraft_policies(self):
+        records = [(100, "deposit"), (-500, "car"), (-20, "restaurant")]
+        stop = Category("Stop", ledger=ColumnarLedger())
+        outcomes = []
+        result = stop.ingest(records, on_overdraft="stop", on_row=lambda row, accepted: outcomes.append((row, accepted)))
+        self.assertEqual(result, (1, 0, True))
+        self.assertEqual(outcomes, [(0, True), (1, False)])
+        self.assertEqual(len(stop.ledger), 1)
+        allow = Category("Allow")
+        self.assertEqual(allow.ingest(iter(records), on_overdraft="allow"), (3, 0, False))
+        self.assertEqual(allow.get_balance(), -420)
+        with self.assertRaises(ValueError):
+            allow.ingest(records, on_overdraft="ignore")
+
+    def test_ingest_failure(self):
+        def records():
+            yield 100, "deposit"
+            yield -10, "groceries"
+            raise OSError("read error")
+
+        category = Category("Stream")
+        with self.assertRaises(OSError):
+            category.ingest(records())
+        with self.assertRaises(TypeError):
+            category.ingest([(5, "refund"), ("bad", "x")])
+        self.assertEqual(category.get_balance(), 95)
+        self.assertEqual([item['amount'] for item in category.ledger], [100, -10, 5])
+        self.assertEqual(category.get_total(), 95)
+
+    def test_file_ledger_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "food")
+            with FileLedger(path, group_size=2) as ledger:
+                food = Category("Food", ledger=ledger)
+                food.deposit(1000, "initial deposit")
+                food.withdraw(10.15, "groceries")
+                food.withdraw(15.89, "groceries")
+                self.assertEqual(ledger[2], {'amount': -15.89, 'description': 'groceries'})
+
+            with FileLedger(path) as ledger:
+                food = Category("Food", ledger=ledger)
+                self.assertEqual(food.get_balance(), 973.96)
+                self.assertEqual(food.get_total_withdraw(), 26.04)
+                self.assertEqual(list(ledger)[1:], [{'amount': -10.15, 'description': 'groceries'},
+                                                    {'amount': -15.89, 'description': 'groceries'}])
+                food.deposit(5, "refund")
+                self.assertEqual(ledger[-1], {'amount': 5, 'description': 'refund'})
+
+            with FileLedger(path) as ledger:
+                self.assertEqual(len(ledger), 4)
+                self.assertEqual(Category("Food", ledger=ledger).get_balance(), 978.96)
+
+    def test_file_ledger_descriptions_written_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "food")
+            for _ in range(3):
+                with FileLedger(path) as ledger:
+                    Category("Food", ledger=ledger).deposit(10, "monthly transfer")
+            self.assertEqual(os.path.getsize(path + ".desc"), 4 + len("monthly transfer"))
+            # a description cut short by an interrupted write is dropped on reopening
+            with open(path + ".desc", "ab") as descriptions:
+                descriptions.write(b"\x10\x00\x00\x00groc")
+            with FileLedger(path) as ledger:
+                Category("Food", ledger=ledger).withdraw(5, "groceries")
+            with FileLedger(path) as ledger:
+                self.assertEqual(list(ledger)[2:], [{'amount': 10, 'description': 'monthly transfer'},
+                                                    {'amount': -5, 'description': 'groceries'}])
+
+    def test_file_ledger_flushed_when_collected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "food")
+            food = Category("Food", ledger=FileLedger(path))
+            food.deposit(100, "deposit")
+            del food
+            gc.collect()
+            with FileLedger(path) as ledger:
+                self.assertEqual(len(ledger), 1)
+
+    def test_file_ledger_replays_after_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "food")
+            with FileLedger(path) as ledger:
+                Category("Food", ledger=ledger).deposit(100, "deposit")
+            with open(path + ".chk", "rb") as checkpoint:
+                saved = checkpoint.read()
+            with FileLedger(path) as ledger:
+                Category("Food", ledger=ledger).deposit(50, "deposit")
+            # simulate a crash between writing the log and the checkpoint
+            with open(path + ".chk", "wb") as checkpoint:
+                checkpoint.write(saved)
+            with FileLedger(path) as ledger:
+                self.assertEqual(Category("Food", ledger=ledger).get_balance(), 150)
+
+    def test_concurrent_transfers(self):
+        categories = [Category(f"Category {i}") for i in range(8)]
+        for category in categories:
+            category.deposit(100)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(500):
+                source, destination = rng.sample(categories, 2)
+                source.transfer(rng.randint(1, 30), destination)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(category.get_balance() for category in categories), 800)
+        for category in categories:
+            self.assertGreaterEqual(category.get_balance(), 0)
+            self.assertEqual(category.get_balance(), sum(item['amount'] for item in category.ledger))
+
+    def test_transfer_many_is_atomic(self):
+        self.food.deposit(100)
+        self.assertFalse(transfer_many([(self.food, self.clothing, 80), (self.food, self.auto, 30)]))
+        self.assertEqual(self.food.get_balance(), 100)
+        self.assertEqual(len(self.clothing.ledger), 0)
+        self.assertTrue(transfer_many([(self.food, self.clothing, 80), (self.clothing, self.auto, 30)]))
+        self.assertEqual(self.clothing.get_balance(), 50)
+        self.assertEqual(self.auto.get_balance(), 30)
+
+    def test_transfer_async(self):
+        self.food.deposit(100)
+        self.assertTrue(asyncio.run(self.food.transfer_async(40, self.clothing)))
+        self.assertEqual(self.clothing.get_balance(), 40)
+
+    def test_balance_at_version(self):
+        self.food.deposit(1000, "initial deposit")
+        self.food.withdraw(10.15, "groceries")
+        self.food.withdraw(15.89, "restaurant")
+        self.assertEqual(self.food.get_version(), 3)
+        self.assertEqual([self.food.get_balance_at(k) for k in range(4)], [0, 1000, 989.85, 973.96])
+        with self.assertRaises(ValueError):
+            self.food.get_balance_at(4)
+
+    def test_snapshot(self):
+        self.food.deposit(1000, "initial deposit")
+        snapshot = self.food.snapshot()
+        self.food.withdraw(10.15, "groceries")
+        self.food.transfer(50, self.clothing)
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.get_balance(), 1000)
+        self.assertEqual(list(snapshot), [{'amount': 1000, 'description': 'initial deposit'}])
+        self.assertEqual(snapshot[-1]['description'], 'initial deposit')
+        with self.assertRaises(IndexError):
+            snapshot[1]
+        self.assertEqual(self.food.snapshot().get_balance(), 939.85)
+
     def test_create_spend_chart(self):
         self.food.deposit(1000)
         self.food.withdraw(100, "groceries")
@@ -52,6 +286,18 @@ class TestBudgetApp(unittest.TestCase):
         chart = create_spend_chart([self.food, self.clothing])
         chart_correct = 'Percentage spent by category\n100|       \n 90|       \n 80|       \n 70|       \n 60|    o  \n 50|    o  \n 40| o  o  \n 30| o  o  \n 20| o  o  \n 10| o  o  \n  0| o  o  \n    -------\n     F  C  \n     o  l  \n     o  o  \n     d  t  \n        h  \n        i  \n        n  \n        g  '
         self.assertEqual(chart, chart_correct)
+
+    def test_create_spend_chart_after_changes(self):
+        self.food.deposit(1000)
+        self.food.withdraw(100, "groceries")
+        self.clothing.deposit(500)
+        self.clothing.withdraw(100, "clothes")
+        first = create_spend_chart([self.food, self.clothing])
+        self.assertIs(create_spend_chart([self.food, self.clothing]), first)
+        self.food.withdraw(200, "restaurant")
+        second = create_spend_chart([self.food, self.clothing])
+        self.assertNotEqual(second, first)
+        self.assertEqual(second.splitlines()[4], ' 70| o     ')
         
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+import unittest
+from budget_app import Category
+from budget_report import BudgetReport
+
+class TestBudgetReport(unittest.TestCase):
+
+    def setUp(self):
+        self.food = Category("Food")
+        self.clothing = Category("Clothing")
+        self.auto = Category("Auto")
+        self.food.deposit(1000, "initial deposit")
+        self.food.withdraw(100, "groceries")
+        self.food.transfer(50, self.clothing)
+        self.report = BudgetReport([self.food, self.clothing, self.auto])
+
+    def test_existing_transactions(self):
+        self.assertEqual(self.report.get_transfers(), {("Food", "Clothing"): 50})
+        self.assertEqual(self.report.get_totals_by_description()["groceries"], -100)
+
+    def test_incremental_updates(self):
+        self.clothing.withdraw(20, "groceries")
+        self.clothing.transfer(10, self.auto)
+        self.food.transfer(5, self.clothing)
+        self.assertEqual(self.report.get_totals_by_description()["groceries"], -120)
+        self.assertEqual(self.report.get_transfers(),
+                         {("Food", "Clothing"): 55, ("Clothing", "Auto"): 10})
+
+    def test_transfers_by_description(self):
+        first = Category("A")
+        first.deposit(100, "deposit")
+        report = BudgetReport([first])
+        first.ingest([(-10, "Transfer to B")])
+        self.assertEqual(report.get_transfers(), {("A", "B"): 10})
+        second = Category("C")
+        second.ingest([(100, "deposit"), (-10, "Transfer to B")])
+        report.add(second)
+        self.assertEqual(report.get_transfers(), {("A", "B"): 10, ("C", "B"): 10})
+
+    def test_top_spenders(self):
+        self.clothing.withdraw(30, "shoes")
+        self.assertEqual(self.report.get_top_spenders(2), [("Food", 150), ("Clothing", 30)])
+
+    def test_spending_percentiles(self):
+        self.assertEqual(self.report.get_spending_percentiles([0, 50, 100]), {0: 0, 50: 0, 100: 150})
+        self.assertEqual(BudgetReport().get_spending_percentiles(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from typing import Any, Dict, List, Optional
+
+from probability_calculator import Hat, _bin_balls, _count_successes, _meets_required, _prepare_trials, experiment, experiment_parallel
+
+
+def _make_hat(hat_size: int, num_colors: int) -> Hat:
+    """
+    Create a hat with hat_size balls shared out as evenly as possible between num_colors colors.
+    """
+    return Hat(**{f'color{i}': hat_size // num_colors + (i < hat_size % num_colors) for i in range(num_colors)})
+
+
+def benchmark_phases(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int) -> Dict[str, float]:
+    """
+    Time the sample, bin and check phases of the trials run by `_count_successes`.
+
+    Each phase calls the same helper as `_count_successes`: the positions of the
+    balls drawn are sampled from the hat, binned into the number of balls of each
+    color with `_bin_balls`, and the counts are checked with `_meets_required`.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        The minimum number of each ball color to draw.
+    num_balls_drawn : int
+        The number of balls drawn in each experiment.
+    num_experiments : int
+        The number of experiments to time.
+
+    Returns
+    -------
+    Dict[str, float]
+        The seconds spent sampling the balls, binning them by color and checking the counts.
+    """
+    required = hat._required_counts(expected_balls)
+    cumulative, population, num_balls_drawn, checked = _prepare_trials(hat._counts, required, num_balls_drawn)
+
+    phases = {'sample_seconds': 0.0, 'bin_seconds': 0.0, 'check_seconds': 0.0}
+    for _ in range(num_experiments):
+        start = time.perf_counter()
+        indexes = random.sample(population, num_balls_drawn)
+        sampled = time.perf_counter()
+        drawn = _bin_balls(cumulative, indexes)
+        binned = time.perf_counter()
+        _meets_required(drawn, checked)
+        end = time.perf_counter()
+
+        phases['sample_seconds'] += sampled - start
+        phases['bin_seconds'] += binned - sampled
+        phases['check_seconds'] += end - binned
+    return phases
+
+
+def benchmark_allocation(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_trials: int = 10) -> float:
+    """
+    Measure the bytes allocated by a single trial of `_count_successes`.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        The minimum number of each ball color to draw.
+    num_balls_drawn : int
+        The number of balls drawn in each experiment.
+    num_trials : int, optional
+        The number of single trials measured (default is 10).
+
+    Returns
+    -------
+    float
+        The mean over the trials of the peak memory allocated while running one trial.
+    """
+    required = hat._required_counts(expected_balls)
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(num_trials):
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        _count_successes(hat._counts, required, num_balls_drawn, 1)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - baseline
+    tracemalloc.stop()
+    return allocated / num_trials
+
+
+def benchmark_experiment(hat_size: int, num_colors: int, num_balls_drawn: int, num_experiments: int) -> Dict[str, Any]:
+    """
+    Measure the speed and memory use of `experiment` for one configuration.
+
+    Parameters
+    ----------
+    hat_size : int
+        The number of balls in the hat.
+    num_colors : int
+        The number of colors the balls are shared out between.
+    num_balls_drawn : int
+        The number of balls drawn in each experiment.
+    num_experiments : int
+        The number of experiments to run.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The configuration with the trials per second of `experiment`, the bytes
+        allocated by one trial of the counts-based sampler and the time split
+        between its sample, bin and check phases.
+    """
+    hat = _make_hat(hat_size, num_colors)
+    expected_balls = {'color0': 1, f'color{num_colors - 1}': 1}
+
+    start = time.perf_counter()
+    experiment(hat, expected_balls, num_balls_drawn, num_experiments)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'hat_size': hat_size,
+        'num_colors': num_colors,
+        'num_balls_drawn': num_balls_drawn,
+        'num_experiments': num_experiments,
+        'seconds': elapsed,
+        'trials_per_second': num_experiments / elapsed,
+        'allocated_bytes_per_trial': benchmark_allocation(hat, expected_balls, num_balls_drawn),
+    }
+    result.update(benchmark_phases(hat, expected_balls, num_balls_drawn, min(num_experiments, 1000)))
+    return result
+
+
+def benchmark_sweep(hat_sizes: List[int], color_counts: List[int], draw_sizes: List[int], experiment_counts: List[int]) -> List[Dict[str, Any]]:
+    """
+    Run `benchmark_experiment` for every combination of the given parameters.
+
+    Combinations with more colors than balls or more balls drawn than balls in the hat are skipped.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One result per configuration.
+    """
+    return [benchmark_experiment(hat_size, num_colors, num_balls_drawn, num_experiments)
+            for hat_size, num_colors, num_balls_drawn, num_experiments
+            in itertools.product(hat_sizes, color_counts, draw_sizes, experiment_counts)
+            if num_colors <= hat_size and num_balls_drawn <= hat_size]
+
+
+def benchmark_parallel_scaling(num_experiments: int = 1_000_000, max_workers: Optional[int] = None, seed: int = 0) -> List[Dict[str, float]]:
+    """
+    Measure how `experiment_parallel` scales with the number of worker processes.
+
+    Parameters
+    ----------
+    num_experiments : int, optional
+        The number of experiments of each run (default is 1000000).
+    max_workers : int, optional
+        The largest number of processes to try (default is the number of CPUs).
+    seed : int, optional
+        The seed shared by every run (default is 0).
+
+    Returns
+    -------
+    List[Dict[str, float]]
+        One entry per number of workers with the elapsed time, the speedup over a
+        single worker and the estimated probability, which must be the same in every run.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    hat = Hat(blue=30, red=20, green=60, yellow=40)
+    expected_balls = {'blue': 3, 'green': 2}
+
+    results = []
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        probability = experiment_parallel(hat, expected_balls, 10, num_experiments, seed=seed, chunk_size=50_000, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        baseline = results[0]['seconds'] if results else elapsed
+        results.append({'workers': workers, 'seconds': elapsed, 'speedup': baseline / elapsed, 'probability': probability})
+        workers *= 2
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the probability calculator and print the results as JSON.')
+    parser.add_argument('--hat-sizes', type=int, nargs='+', default=[100, 10_000, 1_000_000])
+    parser.add_argument('--colors', type=int, nargs='+', default=[2, 10, 50])
+    parser.add_argument('--draws', type=int, nargs='+', default=[5, 50])
+    parser.add_argument('--experiments', type=int, nargs='+', default=[10_000])
+    parser.add_argument('--parallel', action='store_true', help='also measure the scaling of experiment_parallel')
+    parser.add_argument('--output', help='write the JSON to this file instead of printing it')
+    args = parser.parse_args()
+
+    report = {'experiment': benchmark_sweep(args.hat_sizes, args.colors, args.draws, args.experiments)}
+    if args.parallel:
+        report['parallel'] = benchmark_parallel_scaling()
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -1,16 +1,280 @@
-import copy
+import bisect
+import collections
+import collections.abc
+import concurrent.futures
+import itertools
+import json
+import math
+import os
 import random
 
-from typing import List, Dict
+from fractions import Fraction
+from statistics import NormalDist
+from typing import Callable, Dict, Iterator, List, MutableSequence, NamedTuple, Optional
+
+try:
+    import numpy
+except ImportError:
+    # without NumPy every chunk of experiments is sampled one trial at a time
+    numpy = None
+
+# largest number of counts sampled at once by the NumPy path of _count_block_successes
+_NUMPY_BLOCK_ELEMENTS = 1 << 20
+
+# largest number of multiplications done by the inclusion-exclusion of exact_probability
+_INCLUSION_EXCLUSION_LIMIT = 20_000
+
+# relative size below which the floating-point path of exact_probability drops a term
+_NEGLIGIBLE_PROBABILITY = 1e-20
+
+class ExperimentResult(NamedTuple):
+    """
+    The outcome of an experiment together with its confidence interval.
+
+    Attributes
+    ----------
+    probability : float
+        The estimated probability.
+    low : float
+        The lower bound of the confidence interval.
+    high : float
+        The upper bound of the confidence interval.
+    num_experiments : int
+        The number of experiments actually performed.
+    """
+    probability: float
+    low: float
+    high: float
+    num_experiments: int
+
+
+class EstimatorResult(NamedTuple):
+    """
+    The outcome of a variance-reduced experiment.
+
+    Attributes
+    ----------
+    probability : float
+        The estimated probability.
+    variance : float
+        The estimated variance of the probability.
+    num_experiments : int
+        The number of experiments actually performed.
+    """
+    probability: float
+    variance: float
+    num_experiments: int
+
+
+class _ColorTree:
+    """
+    Fenwick tree over the number of balls of each color, used to draw balls by weight.
+
+    Attributes
+    ----------
+    total : int
+        The number of balls left.
+    """
+    def __init__(self, counts: List[int]) -> None:
+        """
+        Initialize a new _ColorTree.
+
+        Parameters
+        ----------
+        counts : list of int
+            The number of balls of each color.
+        """
+        self.total = sum(counts)
+        self._tree = [0] + list(counts)
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+        self._top = 1 << (len(counts).bit_length() - 1) if counts else 0
+
+    def add(self, color_index: int, delta: int) -> None:
+        """
+        Change the number of balls of a color.
+
+        Parameters
+        ----------
+        color_index : int
+            The position of the color.
+        delta : int
+            The number of balls to add (negative to remove).
+        """
+        self.total += delta
+        i = color_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def find(self, ball: int) -> int:
+        """
+        Find the color of a ball given its position among the balls left.
+
+        Parameters
+        ----------
+        ball : int
+            The position of the ball, between 0 and total - 1.
+
+        Returns
+        -------
+        int
+            The position of the color of the ball.
+        """
+        position = 0
+        step = self._top
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= ball:
+                position = following
+                ball -= self._tree[following]
+            step >>= 1
+        return position
+
+
+class _HatContents(collections.abc.MutableSequence):
+    """
+    List-like view of the balls inside a hat, one entry per ball.
+
+    The balls are listed grouped by color, in the order the colors were added.
+    Changes made through the view update the number of balls of each color of the
+    hat, and a new ball joins the balls of its color wherever it is inserted.
+    """
+    def __init__(self, hat: 'Hat') -> None:
+        """
+        Initialize a new _HatContents.
+
+        Parameters
+        ----------
+        hat : Hat
+            The hat whose balls are listed.
+        """
+        self._hat = hat
+
+    def __len__(self) -> int:
+        return sum(self._hat._counts)
+
+    def __iter__(self) -> Iterator[str]:
+        for color, count in zip(self._hat._colors, self._hat._counts):
+            yield from itertools.repeat(color, count)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, _HatContents)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def _locate(self, index: int) -> int:
+        """
+        Find the position of the color of the ball at a given index.
+
+        Raises
+        ------
+        IndexError
+            If the index is out of range.
+        """
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('hat contents index out of range')
+        for color_index, count in enumerate(self._hat._counts):
+            if index < count:
+                return color_index
+            index -= count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self._hat._colors[self._locate(index)]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            contents = list(self)
+            contents[index] = value
+            self._hat.contents = contents
+        else:
+            del self[index]
+            self.insert(index, value)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            contents = list(self)
+            del contents[index]
+            self._hat.contents = contents
+        else:
+            self._hat._counts[self._locate(index)] -= 1
+            self._hat._version += 1
+
+    def insert(self, index: int, value: str) -> None:
+        hat = self._hat
+        if value in hat._colors:
+            hat._counts[hat._colors.index(value)] += 1
+        else:
+            hat._colors.append(value)
+            hat._counts.append(1)
+        hat._version += 1
+
+    def __contains__(self, value: object) -> bool:
+        return self.count(value) > 0
+
+    def __add__(self, other: List[str]) -> List[str]:
+        return list(self) + list(other)
+
+    def __radd__(self, other: List[str]) -> List[str]:
+        return list(other) + list(self)
+
+    def __mul__(self, times: int) -> List[str]:
+        return list(self) * times
+
+    __rmul__ = __mul__
+
+    def count(self, value: str) -> int:
+        hat = self._hat
+        return hat._counts[hat._colors.index(value)] if value in hat._colors else 0
+
+    def copy(self) -> List[str]:
+        return list(self)
+
+    def clear(self) -> None:
+        self._hat._counts = [0] * len(self._hat._counts)
+        self._hat._version += 1
+
+    def _reorder(self, pairs: List[tuple[str, int]]) -> None:
+        """
+        Replace the colors and their numbers of balls with the same pairs in another order.
+        """
+        hat = self._hat
+        hat._colors = [color for color, _ in pairs]
+        hat._counts = [count for _, count in pairs]
+        hat._version += 1
+
+    def reverse(self) -> None:
+        self._reorder(list(zip(self._hat._colors, self._hat._counts))[::-1])
+
+    def sort(self, *, key: Optional[Callable[[str], object]] = None, reverse: bool = False) -> None:
+        # balls of the same color have the same key, so sorting the colors sorts the balls
+        color_key = key or (lambda color: color)
+        self._reorder(sorted(zip(self._hat._colors, self._hat._counts), key=lambda pair: color_key(pair[0]), reverse=reverse))
+
 
 class Hat:
     """
     Represents a hat with balls of different colors inside
 
+    The balls are stored as a list of colors and the number of balls of each color,
+    so the hat can be sampled without building or copying one entry per ball.
+
     Attributes
     ----------
-    contents: List[str]
-        A list with colors that symbolize the balls that are inside the hat.
+    contents: MutableSequence[str]
+        A list-like view with colors that symbolize the balls that are inside the hat.
+        It supports the usual list operations, such as append and remove, which add
+        and remove balls from the hat.
     """
     def __init__(self, **kwargs: int) -> None:
         """
@@ -25,11 +289,39 @@ class Hat:
         if len(kwargs) < 1:
             raise ValueError("Hat must contain at least one ball")
 
-        self.contents = []
+        self._colors = list(kwargs)
+        # a negative number of balls leaves the color empty, as repeating a list a negative number of times does
+        self._counts = [max(0, count) for count in kwargs.values()]
+        # incremented whenever balls are added or removed, so draw_iter notices changes
+        self._version = 0
+
+    @property
+    def contents(self) -> MutableSequence[str]:
+        """
+        MutableSequence[str]: The colors of the balls that are inside the hat, one entry per ball.
+        """
+        return _HatContents(self)
+
+    @contents.setter
+    def contents(self, contents: List[str]) -> None:
+        counts = {}
+        for color in contents:
+            counts[color] = counts.get(color, 0) + 1
+        self._colors = list(counts)
+        self._counts = list(counts.values())
+        self._version += 1
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Get the number of balls of each color inside the hat.
+
+        Returns
+        -------
+        Dict[str, int]
+            A dictionary with the colors as keys and the number of balls of that color as values.
+        """
+        return {color: count for color, count in zip(self._colors, self._counts) if count > 0}
 
-        for color, count in kwargs.items():
-            self.contents.extend([color] * count)
-    
     def draw(self, num_balls: int) -> List[str]:
         """
         Randomly remove balls from the hat.
@@ -44,18 +336,412 @@ class Hat:
         List[str]
             A list with the colors of the balls drawn.
         """
-        if num_balls >= len(self.contents):
-            drawn = self.contents.copy()
-            self.contents.clear()
+        if num_balls >= sum(self._counts):
+            drawn = list(self.contents)
+            self._counts = [0] * len(self._counts)
+            self._version += 1
             return drawn
-    
-        drawn = random.sample(self.contents, num_balls)
-        for ball in drawn:
-            self.contents.remove(ball)
-        return drawn
-        
 
-def experiment(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int) -> float:
+        return list(self.draw_iter(num_balls))
+
+    def draw_iter(self, num_balls: Optional[int] = None) -> Iterator[str]:
+        """
+        Randomly remove balls from the hat one at a time.
+
+        The balls left of each color are kept in a Fenwick tree, so every ball is
+        drawn in O(log C) time for C colors and the memory used is proportional to
+        the number of colors, not to the number of balls. If the hat is changed while
+        the generator is in use, the tree is rebuilt from the balls left before the
+        next ball is drawn.
+
+        Parameters
+        ----------
+        num_balls : int, optional
+            The number of balls to draw. If not provided, balls are drawn until the hat is empty.
+
+        Yields
+        ------
+        str
+            The color of each ball drawn, which is removed from the hat before being yielded.
+        """
+        tree = _ColorTree(self._counts)
+        version = self._version
+        remaining = tree.total
+        if num_balls is not None:
+            remaining = min(remaining, num_balls)
+
+        for _ in range(remaining):
+            if self._version != version:
+                tree = _ColorTree(self._counts)
+            if tree.total == 0:
+                return
+            color_index = tree.find(random.randrange(tree.total))
+            tree.add(color_index, -1)
+            self._counts[color_index] -= 1
+            self._version += 1
+            version = self._version
+            yield self._colors[color_index]
+
+    def _required_counts(self, expected_balls: Dict[str, int]) -> Optional[List[int]]:
+        """
+        Translate the expected balls into a vector aligned with the colors of the hat.
+
+        Parameters
+        ----------
+        expected_balls : dict of str to int
+            A dictionary indicating the minimum number of each ball color.
+
+        Returns
+        -------
+        List[int] or None
+            The minimum number of balls of each color, or None if the hat does not
+            contain a color that is expected at least once.
+        """
+        required = [0] * len(self._colors)
+        color_indexes = {color: i for i, color in enumerate(self._colors)}
+        for color, count in expected_balls.items():
+            if color in color_indexes:
+                required[color_indexes[color]] = count
+            elif count > 0:
+                return None
+        return required
+
+
+def _count_successes(counts: List[int], required: List[int], num_balls_drawn: int, num_experiments: int, rng: Optional[random.Random] = None) -> int:
+    """
+    Count how many random draws satisfy the required counts, without modifying any hat.
+
+    Parameters
+    ----------
+    counts : list of int
+        The number of balls of each color inside the hat.
+    required : list of int
+        The minimum number of balls of each color that must be drawn.
+    num_balls_drawn : int
+        The number of balls to draw in each experiment.
+    num_experiments : int
+        The number of experiments to perform.
+    rng : random.Random, optional
+        The random generator to use (default is the global `random` module).
+
+    Returns
+    -------
+    int
+        The number of successful experiments.
+    """
+    sample = (rng or random).sample
+    cumulative, population, num_balls_drawn, checked = _prepare_trials(counts, required, num_balls_drawn)
+
+    successful_experiments = 0
+    for _ in range(num_experiments):
+        drawn = _bin_balls(cumulative, sample(population, num_balls_drawn))
+        if _meets_required(drawn, checked):
+            successful_experiments += 1
+    return successful_experiments
+
+
+def _prepare_trials(counts: List[int], required: List[int], num_balls_drawn: int) -> tuple[List[int], range, int, List[tuple[int, int]]]:
+    """
+    Precompute what every trial of `_count_successes` needs.
+
+    Parameters
+    ----------
+    counts : list of int
+        The number of balls of each color inside the hat.
+    required : list of int
+        The minimum number of balls of each color that must be drawn.
+    num_balls_drawn : int
+        The number of balls to draw in each experiment.
+
+    Returns
+    -------
+    tuple
+        The cumulative numbers of balls of the colors, the positions of the balls to
+        sample from, the number of balls actually drawn and the (color position,
+        minimum) pairs to check.
+    """
+    cumulative = list(itertools.accumulate(counts))
+    total_balls = cumulative[-1] if cumulative else 0
+    checked = [(i, count) for i, count in enumerate(required) if count > 0]
+    return cumulative, range(total_balls), min(num_balls_drawn, total_balls), checked
+
+
+def _bin_balls(cumulative: List[int], indexes: List[int]) -> List[int]:
+    """
+    Count the balls of each color among the sampled ball positions.
+    """
+    drawn = [0] * len(cumulative)
+    for index in indexes:
+        drawn[bisect.bisect_right(cumulative, index)] += 1
+    return drawn
+
+
+def _meets_required(drawn: List[int], checked: List[tuple[int, int]]) -> bool:
+    """
+    Check whether the balls drawn of each color reach the required minimums.
+    """
+    return all(drawn[i] >= count for i, count in checked)
+
+
+def _block_rng(seed: int, block: int) -> random.Random:
+    """
+    Create the random generator of one block of experiments.
+
+    Each block gets its own generator derived from the seed and the block number,
+    so blocks can be run in any order, or on different processes, and still
+    produce the same draws.
+
+    Parameters
+    ----------
+    seed : int
+        The seed of the whole run.
+    block : int
+        The position of the block inside the run.
+
+    Returns
+    -------
+    random.Random
+        An independent generator for the block.
+    """
+    return random.Random(f'{seed}:{block}')
+
+
+def _count_block_successes(counts: List[int], required: List[int], num_balls_drawn: int, num_experiments: int, seed: int, block: int) -> int:
+    """
+    Count the successful experiments of one block, using the generator of that block.
+
+    Parameters
+    ----------
+    counts : list of int
+        The number of balls of each color inside the hat.
+    required : list of int
+        The minimum number of balls of each color that must be drawn.
+    num_balls_drawn : int
+        The number of balls to draw in each experiment.
+    num_experiments : int
+        The number of experiments in the block.
+    seed : int
+        The seed of the whole run.
+    block : int
+        The position of the block inside the run.
+
+    Returns
+    -------
+    int
+        The number of successful experiments in the block.
+    """
+    if numpy is None or not counts:
+        return _count_successes(counts, required, num_balls_drawn, num_experiments, _block_rng(seed, block))
+
+    # one multivariate hypergeometric sample per row gives the balls drawn of every color,
+    # and the success test is a reduction over the rows
+    rng = numpy.random.default_rng([block, seed % 2 ** 64])
+    colors = numpy.array(counts, dtype=numpy.int64)
+    minimums = numpy.array(required, dtype=numpy.int64)
+    num_balls_drawn = min(num_balls_drawn, int(colors.sum()))
+    rows = max(1, _NUMPY_BLOCK_ELEMENTS // len(counts))
+
+    successful_experiments = 0
+    for start in range(0, num_experiments, rows):
+        drawn = rng.multivariate_hypergeometric(colors, num_balls_drawn, size=min(rows, num_experiments - start))
+        successful_experiments += int((drawn >= minimums).all(axis=1).sum())
+    return successful_experiments
+
+
+def exact_probability(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int) -> float:
+    """
+    Compute the exact probability of drawing at least the expected balls from a hat.
+
+    The number of balls of each color drawn follows a multivariate hypergeometric
+    distribution. The favourable draws are counted exactly by inclusion-exclusion
+    over the colors that fall short of their expected count: only the few ways of
+    drawing fewer balls than expected are enumerated, and colors with the same
+    number of balls share their terms, so hats with dozens of colors and thousands
+    of balls are answered in milliseconds. When the colors have so many different
+    sizes that the terms would grow too numerous, the probability is instead
+    computed with a dynamic program over hypergeometric probabilities in floating
+    point, which skips the negligible terms and is accurate to double precision.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        A dictionary indicating the minimum number of each ball color
+        that should be drawn for the draw to be considered successful.
+    num_balls_drawn : int
+        The number of balls to draw out of the hat.
+
+    Returns
+    -------
+    float
+        The exact probability of drawing at least the expected balls.
+
+    Raises
+    ------
+    ValueError
+        If num_balls_drawn is negative.
+    """
+    if num_balls_drawn < 0:
+        raise ValueError('num_balls_drawn must not be negative')
+
+    counts = hat.counts()
+    total_balls = sum(counts.values())
+    num_balls_drawn = min(num_balls_drawn, total_balls)
+
+    # the number of balls and the expected count of every color that must be drawn
+    constraints = []
+    for color, expected in expected_balls.items():
+        available = counts.get(color, 0)
+        if expected > available:
+            return 0.0
+        if expected > 0:
+            constraints.append((available, expected))
+    if sum(expected for _, expected in constraints) > num_balls_drawn:
+        return 0.0
+
+    favourable = _count_favourable_draws(total_balls, num_balls_drawn, constraints)
+    if favourable is None:
+        return _favourable_probability(total_balls, num_balls_drawn, constraints)
+    return float(Fraction(favourable, math.comb(total_balls, num_balls_drawn)))
+
+
+def _count_favourable_draws(total_balls: int, num_balls_drawn: int, constraints: List[tuple[int, int]]) -> Optional[int]:
+    """
+    Count the draws meeting every expected count by inclusion-exclusion.
+
+    The draws are the coefficient of z**num_balls_drawn in the product over the
+    colors of (1 + z)**available, where each expected color keeps only its terms
+    of degree at least expected, that is (1 + z)**available - low(z) with low(z)
+    the terms of lower degree. Expanding the product over the set S of colors
+    whose low(z) is taken gives (1 + z)**(total_balls - size of S) times the
+    product of -low(z) over S, so the terms are kept by the number of balls of
+    the colors in S, and sets with the same number of balls are merged.
+
+    Parameters
+    ----------
+    total_balls : int
+        The number of balls inside the hat.
+    num_balls_drawn : int
+        The number of balls drawn.
+    constraints : list of tuple[int, int]
+        The number of balls and the expected count of every expected color.
+
+    Returns
+    -------
+    int or None
+        The number of favourable draws, or None if expanding the products would take
+        more than `_INCLUSION_EXCLUSION_LIMIT` multiplications.
+    """
+    # terms[size] holds the coefficients of the product of -low(z) over the sets of that size
+    terms = {0: [1]}
+    work = 0
+    for available, expected in constraints:
+        work += expected * sum(len(coefficients) for coefficients in terms.values())
+        if work > _INCLUSION_EXCLUSION_LIMIT:
+            return None
+
+        low = [-math.comb(available, k) for k in range(expected)]
+        new_terms = {size: list(coefficients) for size, coefficients in terms.items()}
+        for size, coefficients in terms.items():
+            degree = min(len(coefficients) + expected - 1, num_balls_drawn + 1)
+            target = new_terms.setdefault(size + available, [])
+            target.extend([0] * (degree - len(target)))
+            for t, coefficient in enumerate(coefficients):
+                for k in range(min(expected, degree - t)):
+                    target[t + k] += coefficient * low[k]
+        terms = new_terms
+
+    return sum(coefficient * math.comb(total_balls - size, num_balls_drawn - t)
+               for size, coefficients in terms.items()
+               for t, coefficient in enumerate(coefficients) if coefficient)
+
+
+def _favourable_probability(total_balls: int, num_balls_drawn: int, constraints: List[tuple[int, int]]) -> float:
+    """
+    Compute the probability of meeting every expected count with floating-point hypergeometric probabilities.
+
+    The colors are processed one at a time. probabilities[j] is the probability that
+    the colors processed so far meet their expected counts and account for j of the
+    balls drawn; the balls of the next color then follow a hypergeometric distribution
+    over the remaining draws and the remaining balls. Each distribution is walked from
+    its mode with ratio recurrences and normalised by the sum of its terms. The walk
+    stops once the terms fall below `_NEGLIGIBLE_PROBABILITY` of the mode, or of the
+    first term meeting the expected count when that term is past the mode, and states
+    that small are dropped.
+
+    Parameters
+    ----------
+    total_balls : int
+        The number of balls inside the hat.
+    num_balls_drawn : int
+        The number of balls drawn.
+    constraints : list of tuple[int, int]
+        The number of balls and the expected count of every expected color.
+
+    Returns
+    -------
+    float
+        The probability of drawing at least the expected balls.
+    """
+    probabilities = {0: 1.0}
+    remaining = total_balls
+    for available, expected in constraints:
+        others = remaining - available
+        new_probabilities = collections.defaultdict(float)
+        for j, probability in probabilities.items():
+            draws = num_balls_drawn - j
+            support_low, high = max(0, draws - others), min(available, draws)
+            low = max(expected, support_low)
+            if low > high:
+                continue
+
+            # the terms relative to the mode, normalised by their sum, so no factorial is evaluated
+            mode = min(max((draws + 1) * (available + 1) // (remaining + 2), support_low), high)
+            gap = others - draws
+            kept = []
+            total = 0.0
+
+            term, k = 1.0, mode
+            cutoff = _NEGLIGIBLE_PROBABILITY
+            while term > 0:
+                total += term
+                if k >= low:
+                    if k == low:
+                        cutoff = term * _NEGLIGIBLE_PROBABILITY
+                    if term <= cutoff:
+                        break
+                    kept.append((k, term))
+                if k == high:
+                    break
+                term *= (available - k) * (draws - k) / ((k + 1) * (gap + k + 1))
+                k += 1
+
+            term, k = 1.0, mode
+            while k > support_low:
+                term *= k * (gap + k) / ((available - k + 1) * (draws - k + 1))
+                k -= 1
+                if term <= _NEGLIGIBLE_PROBABILITY:
+                    break
+                total += term
+                if k >= low:
+                    kept.append((k, term))
+
+            scale = probability / total
+            for k, term in kept:
+                new_probabilities[j + k] += term * scale
+
+        if not new_probabilities:
+            return 0.0
+        cutoff = max(new_probabilities.values()) * _NEGLIGIBLE_PROBABILITY
+        probabilities = {j: probability for j, probability in new_probabilities.items() if probability > cutoff}
+        remaining = others
+
+    # the balls of the colors that are not expected can be drawn in any quantity
+    return min(1.0, sum(probabilities.values()))
+
+
+def experiment(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int, method: str = 'monte_carlo') -> float:
     """
     Perform a probability experiment of drawing specific balls from a hat.
 
@@ -70,32 +756,526 @@ def experiment(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, n
         The number of balls to draw out of the hat in each experiment.
     num_experiments : int
         The total number of experiments to perform.
+    method : str, optional
+        'monte_carlo' to estimate the probability by random sampling (default),
+        or 'exact' to compute it with `exact_probability`, ignoring num_experiments.
 
     Returns
     -------
     float
         The estimated probability of drawing at least the expected balls.
+
+    Raises
+    ------
+    ValueError
+        If method is not 'monte_carlo' or 'exact'.
     """
-    successful_experiments = 0
-    for _ in range(num_experiments):
+    if method == 'exact':
+        return exact_probability(hat, expected_balls, num_balls_drawn)
+    if method != 'monte_carlo':
+        raise ValueError("method must be 'monte_carlo' or 'exact'")
 
-        # Copy the hat to avoid modifying the original
+    required = hat._required_counts(expected_balls)
+    if required is None:
+        return 0.0
 
-        hat_copy = copy.deepcopy(hat)
+    successful_experiments = _count_successes(hat._counts, required, num_balls_drawn, num_experiments)
 
-        # Draw balls from the copied hat
-        balls_drawn = hat_copy.draw(num_balls_drawn)
+    return successful_experiments / num_experiments
 
-        # Check if the drawn balls satisfy expected counts
 
-        success = True
+def experiment_importance(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int, seed: Optional[int] = None) -> EstimatorResult:
+    """
+    Estimate the probability of a rare outcome by importance sampling.
 
-        for color, count in expected_balls.items():
-            if balls_drawn.count(color) < count:
-                success = False
+    The number of balls drawn of each expected color is sampled one color at a time
+    from its exact hypergeometric distribution given the previous colors, restricted
+    to the values that reach the expected count. Every experiment is weighted by the
+    probability of the values it was restricted to, so no experiment is wasted on
+    failures and the estimate stays unbiased with a far smaller variance than plain
+    Monte Carlo when the outcome is rare.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        A dictionary indicating the minimum number of each ball color
+        that should be drawn for the experiment to be considered successful.
+    num_balls_drawn : int
+        The number of balls to draw out of the hat in each experiment.
+    num_experiments : int
+        The total number of experiments to perform.
+    seed : int, optional
+        The seed of the run. If not provided, a random seed is used.
+
+    Returns
+    -------
+    EstimatorResult
+        The estimated probability, its estimated variance and the number of experiments performed.
+    """
+    rng = random.Random(seed)
+
+    required = hat._required_counts(expected_balls)
+    if required is None:
+        return EstimatorResult(0.0, 0.0, 0)
+
+    counts = hat._counts
+    total_balls = sum(counts)
+    num_balls_drawn = min(num_balls_drawn, total_balls)
+
+    # the expected colors, each with the number of balls left in the hat once the previous ones are set aside
+    checked = [(counts[i], count) for i, count in enumerate(required) if count > 0]
+    levels = []
+    remaining = total_balls
+    for available, count in checked:
+        levels.append((available, count, remaining))
+        remaining -= available
+
+    tables = {}
+
+    def table(level: int, draws: int) -> tuple[float, List[int], List[float]]:
+        # probability of reaching the expected count of the color, with the values that do and their cumulative weights
+        if (level, draws) not in tables:
+            available, count, balls = levels[level]
+            values = list(range(max(count, draws - (balls - available)), min(available, draws) + 1))
+            weights = [math.comb(available, j) * math.comb(balls - available, draws - j) for j in values]
+            mass = float(Fraction(sum(weights), math.comb(balls, draws)))
+            tables[(level, draws)] = (mass, values, list(itertools.accumulate(weights)))
+        return tables[(level, draws)]
+
+    total = 0.0
+    total_squares = 0.0
+    for _ in range(num_experiments):
+        weight = 1.0
+        draws = num_balls_drawn
+        for level in range(len(levels)):
+            mass, values, cumulative = table(level, draws)
+            weight *= mass
+            if weight == 0.0 or level == len(levels) - 1:
                 break
-        
-        if success:
-            successful_experiments += 1
+            draws -= values[bisect.bisect_right(cumulative, rng.randrange(cumulative[-1]))]
+        total += weight
+        total_squares += weight * weight
+
+    if num_experiments == 0:
+        return EstimatorResult(float(not levels), 0.0, 0)
+
+    probability = total / num_experiments
+    variance = max(0.0, total_squares / num_experiments - probability * probability) / num_experiments
+    return EstimatorResult(probability, variance, num_experiments)
+
+
+def experiment_batch(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int, seed: Optional[int] = None, chunk_size: int = 100_000) -> float:
+    """
+    Perform a reproducible probability experiment in fixed-size chunks.
+
+    The hat is encoded once as color counts and every chunk of experiments is run
+    with its own generator derived from the seed, so memory stays bounded by the
+    number of colors no matter how many experiments are requested, and the same
+    seed always gives the same result.
+
+    When NumPy is installed, the balls of each color drawn in every trial of a chunk
+    are sampled at once from a multivariate hypergeometric distribution and checked
+    with array reductions. Otherwise the trials are run one at a time in Python.
+    The two paths use different generators, so a seed reproduces its result only
+    with the same one.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        A dictionary indicating the minimum number of each ball color
+        that should be drawn for the experiment to be considered successful.
+    num_balls_drawn : int
+        The number of balls to draw out of the hat in each experiment.
+    num_experiments : int
+        The total number of experiments to perform.
+    seed : int, optional
+        The seed of the run. If not provided, a random seed is used.
+    chunk_size : int, optional
+        The number of experiments performed by each generator (default is 100000).
+
+    Returns
+    -------
+    float
+        The estimated probability of drawing at least the expected balls.
+
+    Raises
+    ------
+    ValueError
+        If chunk_size is not positive.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    required = hat._required_counts(expected_balls)
+    if required is None:
+        return 0.0
+
+    successful_experiments = 0
+    for block, start in enumerate(range(0, num_experiments, chunk_size)):
+        size = min(chunk_size, num_experiments - start)
+        successful_experiments += _count_block_successes(hat._counts, required, num_balls_drawn, size, seed, block)
+
+    return successful_experiments / num_experiments
+
+
+def experiment_parallel(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int, seed: Optional[int] = None, chunk_size: int = 100_000, workers: Optional[int] = None) -> float:
+    """
+    Perform a reproducible probability experiment on several processes.
+
+    The experiments are split in the same chunks as `experiment_batch` and the chunks
+    are shared out between a pool of processes. Each chunk derives its generator from
+    the seed and its position, so for a given seed and chunk_size the result is the
+    same as `experiment_batch` whatever the number of workers.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        A dictionary indicating the minimum number of each ball color
+        that should be drawn for the experiment to be considered successful.
+    num_balls_drawn : int
+        The number of balls to draw out of the hat in each experiment.
+    num_experiments : int
+        The total number of experiments to perform.
+    seed : int, optional
+        The seed of the run. If not provided, a random seed is used.
+    chunk_size : int, optional
+        The number of experiments performed by each generator (default is 100000).
+    workers : int, optional
+        The number of processes to use (default is the number of CPUs).
+
+    Returns
+    -------
+    float
+        The estimated probability of drawing at least the expected balls.
+
+    Raises
+    ------
+    ValueError
+        If chunk_size is not positive.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    required = hat._required_counts(expected_balls)
+    if required is None:
+        return 0.0
+
+    starts = range(0, num_experiments, chunk_size)
+    sizes = [min(chunk_size, num_experiments - start) for start in starts]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        successful_experiments = sum(executor.map(
+            _count_block_successes,
+            itertools.repeat(hat._counts),
+            itertools.repeat(required),
+            itertools.repeat(num_balls_drawn),
+            sizes,
+            itertools.repeat(seed),
+            range(len(sizes))
+        ))
+
+    return successful_experiments / num_experiments
+
+
+def wilson_interval(successes: int, num_experiments: int, confidence: float = 0.95) -> tuple[float, float]:
+    """
+    Compute the Wilson score interval of a proportion.
+
+    Parameters
+    ----------
+    successes : int
+        The number of successful experiments.
+    num_experiments : int
+        The number of experiments performed.
+    confidence : float, optional
+        The confidence level of the interval (default is 0.95).
+
+    Returns
+    -------
+    tuple[float, float]
+        The lower and upper bounds of the interval.
+    """
+    if num_experiments == 0:
+        return 0.0, 1.0
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    proportion = successes / num_experiments
+    denominator = 1 + z * z / num_experiments
+    centre = (proportion + z * z / (2 * num_experiments)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / num_experiments + z * z / (4 * num_experiments ** 2)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def experiment_adaptive(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, half_width: float = 0.01, relative_error: Optional[float] = None, max_experiments: int = 1_000_000, confidence: float = 0.95, batch_size: int = 1000, seed: Optional[int] = None) -> ExperimentResult:
+    """
+    Perform experiments in batches until the estimate reaches the requested precision.
+
+    After every batch the Wilson interval of the estimate is updated, and the
+    experiment stops as soon as its half-width is below the target or the budget
+    of experiments is spent.
+
+    Parameters
+    ----------
+    hat : Hat
+        The hat object containing balls.
+    expected_balls : dict of str to int
+        A dictionary indicating the minimum number of each ball color
+        that should be drawn for the experiment to be considered successful.
+    num_balls_drawn : int
+        The number of balls to draw out of the hat in each experiment.
+    half_width : float, optional
+        The largest accepted half-width of the interval (default is 0.01).
+    relative_error : float, optional
+        If provided, the half-width must instead be below this fraction of the estimate.
+    max_experiments : int, optional
+        The largest number of experiments to perform (default is 1000000).
+    confidence : float, optional
+        The confidence level of the interval (default is 0.95).
+    batch_size : int, optional
+        The number of experiments performed between two checks (default is 1000).
+    seed : int, optional
+        The seed of the run. If not provided, a random seed is used.
+
+    Returns
+    -------
+    ExperimentResult
+        The estimated probability, its interval and the number of experiments performed.
+
+    Raises
+    ------
+    ValueError
+        If batch_size or max_experiments is not positive.
+    """
+    if batch_size < 1 or max_experiments < 1:
+        raise ValueError('batch_size and max_experiments must be positive')
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    required = hat._required_counts(expected_balls)
+    if required is None:
+        return ExperimentResult(0.0, 0.0, 0.0, 0)
+
+    successful_experiments = 0
+    num_experiments = 0
+    block = 0
+    while num_experiments < max_experiments:
+        size = min(batch_size, max_experiments - num_experiments)
+        successful_experiments += _count_block_successes(hat._counts, required, num_balls_drawn, size, seed, block)
+        num_experiments += size
+        block += 1
+
+        low, high = wilson_interval(successful_experiments, num_experiments, confidence)
+        target = half_width if relative_error is None else relative_error * successful_experiments / num_experiments
+        if (high - low) / 2 <= target:
+            break
+
+    low, high = wilson_interval(successful_experiments, num_experiments, confidence)
+    return ExperimentResult(successful_experiments / num_experiments, low, high, num_experiments)
+
+
+class ProbabilityCache:
+    """
+    Stores the results of experiments so that repeated queries are not simulated again.
+
+    Queries are identified by the number of balls of each color in the hat, the
+    expected balls and the number of balls drawn, independently of the order in
+    which the colors were given. Each entry keeps its number of successes and
+    experiments, so it can be refined with more experiments later on.
+
+    Attributes
+    ----------
+    maxsize : int
+        The largest number of queries kept; the least recently used is removed first.
+    path : str or None
+        The file where the cache is saved, if any.
+    """
+    def __init__(self, maxsize: int = 1024, path: Optional[str] = None) -> None:
+        """
+        Initialize a new ProbabilityCache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            The largest number of queries kept (default is 1024).
+        path : str, optional
+            A JSON file used to persist the cache. It is loaded if it already exists.
+
+        Raises
+        ------
+        ValueError
+            If maxsize is not positive.
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = collections.OrderedDict()
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        """
+        Return the number of cached queries.
+        """
+        return len(self._entries)
+
+    @staticmethod
+    def _key(hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int) -> tuple:
+        """
+        Build the canonical key of a query.
+
+        Parameters
+        ----------
+        hat : Hat
+            The hat object containing balls.
+        expected_balls : dict of str to int
+            The minimum number of each ball color to draw.
+        num_balls_drawn : int
+            The number of balls drawn in each experiment.
+
+        Returns
+        -------
+        tuple
+            The sorted color counts, the sorted expected balls and the effective draw size.
+        """
+        counts = tuple(sorted(hat.counts().items()))
+        expected = tuple(sorted((color, count) for color, count in expected_balls.items() if count > 0))
+        return counts, expected, min(num_balls_drawn, sum(count for _, count in counts))
+
+    def _store(self, key: tuple, successes: int, num_experiments: int) -> None:
+        """
+        Save an entry as the most recently used one, removing the oldest if the cache is full.
+        """
+        self._entries[key] = (successes, num_experiments)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def query(self, hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int) -> float:
+        """
+        Get the estimated probability of a query, running only the missing experiments.
+
+        If the query is cached with at least num_experiments experiments the stored
+        estimate is returned. Otherwise the stored estimate is refined with the
+        missing experiments.
+
+        Parameters
+        ----------
+        hat : Hat
+            The hat object containing balls.
+        expected_balls : dict of str to int
+            A dictionary indicating the minimum number of each ball color
+            that should be drawn for the experiment to be considered successful.
+        num_balls_drawn : int
+            The number of balls to draw out of the hat in each experiment.
+        num_experiments : int
+            The minimum number of experiments the estimate must be based on.
+
+        Returns
+        -------
+        float
+            The estimated probability of drawing at least the expected balls.
+
+        Raises
+        ------
+        ValueError
+            If num_experiments is not positive.
+        """
+        if num_experiments < 1:
+            raise ValueError('num_experiments must be positive')
+
+        key = self._key(hat, expected_balls, num_balls_drawn)
+        successes, done = self._entries.get(key, (0, 0))
+        if done >= num_experiments and done > 0:
+            self._entries.move_to_end(key)
+            return successes / done
+        return self.refine(hat, expected_balls, num_balls_drawn, num_experiments - done)
+
+    def refine(self, hat: Hat, expected_balls: Dict[str, int], num_balls_drawn: int, num_experiments: int) -> float:
+        """
+        Add experiments to the cached estimate of a query.
+
+        Parameters
+        ----------
+        hat : Hat
+            The hat object containing balls.
+        expected_balls : dict of str to int
+            A dictionary indicating the minimum number of each ball color
+            that should be drawn for the experiment to be considered successful.
+        num_balls_drawn : int
+            The number of balls to draw out of the hat in each experiment.
+        num_experiments : int
+            The number of experiments to add.
+
+        Returns
+        -------
+        float
+            The refined estimated probability of drawing at least the expected balls.
+
+        Raises
+        ------
+        ValueError
+            If num_experiments is not positive.
+        """
+        if num_experiments < 1:
+            raise ValueError('num_experiments must be positive')
+
+        key = self._key(hat, expected_balls, num_balls_drawn)
+        successes, done = self._entries.get(key, (0, 0))
+
+        required = hat._required_counts(expected_balls)
+        if required is not None:
+            successes += _count_successes(hat._counts, required, num_balls_drawn, num_experiments)
+        done += num_experiments
+
+        self._store(key, successes, done)
+        return successes / done
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write the cache to a JSON file.
+
+        Parameters
+        ----------
+        path : str, optional
+            The file to write (default is the path given when creating the cache).
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError('a path is required to save the cache')
+
+        entries = [[list(map(list, counts)), list(map(list, expected)), num_balls_drawn, successes, done]
+                   for (counts, expected, num_balls_drawn), (successes, done) in self._entries.items()]
+        with open(path, 'w') as file:
+            json.dump(entries, file)
+
+    def load(self, path: Optional[str] = None) -> None:
+        """
+        Add the entries of a JSON file written by `save` to the cache.
+
+        Parameters
+        ----------
+        path : str, optional
+            The file to read (default is the path given when creating the cache).
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError('a path is required to load the cache')
 
-    return successful_experiments / num_experiments
\ No newline at end of file
+        with open(path) as file:
+            entries = json.load(file)
+        for counts, expected, num_balls_drawn, successes, done in entries:
+            key = (tuple(map(tuple, counts)), tuple(map(tuple, expected)), num_balls_drawn)
+            self._store(key, successes, done)
@@ -1,5 +1,10 @@
+import math
+import os
+import tempfile
+import time
 import unittest
-from probability_calculator import Hat, experiment
+import probability_calculator
+from probability_calculator import Hat, ProbabilityCache, exact_probability, experiment, experiment_adaptive, experiment_importance, experiment_batch, experiment_parallel, wilson_interval
 
 class TestProbabilityCalculator(unittest.TestCase):
 
@@ -34,5 +39,262 @@ class TestProbabilityCalculator(unittest.TestCase):
         # Roughly check if the probability is around an expected value
         self.assertAlmostEqual(prob, 0.27, delta=0.1)
 
+    def test_draw_updates_counts(self):
+        hat = Hat(red=3, blue=2)
+        drawn = hat.draw(3)
+        counts = hat.counts()
+        self.assertEqual(drawn.count("red") + counts.get("red", 0), 3)
+        self.assertEqual(drawn.count("blue") + counts.get("blue", 0), 2)
+        self.assertEqual(len(hat.contents), 2)
+
+    def test_draw_iter(self):
+        hat = Hat(red=3, blue=2, green=1)
+        balls = hat.draw_iter(4)
+        first = next(balls)
+        self.assertEqual(sum(hat.counts().values()), 5)
+        drawn = [first] + list(balls)
+        self.assertEqual(len(drawn), 4)
+        self.assertEqual(sum(hat.counts().values()), 2)
+        drawn += list(hat.draw_iter())
+        self.assertEqual(sorted(drawn), sorted(["red"] * 3 + ["blue"] * 2 + ["green"]))
+        self.assertEqual(hat.counts(), {})
+
+    def test_draw_iter_after_changes(self):
+        hat = Hat(red=2, blue=2)
+        balls = hat.draw_iter()
+        next(balls)
+        hat.draw(10)
+        self.assertEqual(list(balls), [])
+        self.assertEqual(hat._counts, [0, 0])
+
+        hat = Hat(red=3, blue=3)
+        first, second = hat.draw_iter(), hat.draw_iter()
+        drawn = [next(first), next(second), next(first)]
+        hat.contents = ["green"]
+        drawn += list(second)
+        self.assertEqual(drawn[3:], ["green"])
+        self.assertEqual(list(first), [])
+        self.assertEqual(hat.counts(), {})
+
+    def test_draw_iter_large_hat(self):
+        hat = Hat(red=10 ** 7, blue=10 ** 7)
+        drawn = list(hat.draw_iter(1000))
+        self.assertEqual(hat.counts()["red"] + hat.counts()["blue"], 2 * 10 ** 7 - 1000)
+        self.assertEqual(hat.counts()["red"], 10 ** 7 - drawn.count("red"))
+
+    def test_contents_assignment(self):
+        hat = Hat(red=1)
+        hat.contents = ["blue", "red", "blue"]
+        self.assertEqual(hat.counts(), {"blue": 2, "red": 1})
+
+    def test_contents_mutation(self):
+        hat = Hat(red=2, blue=1)
+        hat.contents.append("green")
+        hat.contents.remove("red")
+        hat.contents.extend(["blue", "yellow"])
+        self.assertEqual(hat.counts(), {"red": 1, "blue": 2, "green": 1, "yellow": 1})
+        self.assertEqual(hat.contents, ["red", "blue", "blue", "green", "yellow"])
+        self.assertEqual(hat.contents.pop(), "yellow")
+        del hat.contents[0]
+        hat.contents[-1] = "red"
+        self.assertEqual(sorted(hat.contents), ["blue", "blue", "red"])
+        hat.contents[:2] = ["white"]
+        self.assertEqual(hat.counts(), {"blue": 1, "white": 1})
+        with self.assertRaises(ValueError):
+            hat.contents.remove("purple")
+        with self.assertRaises(IndexError):
+            hat.contents[2]
+        hat.contents.clear()
+        self.assertEqual(hat.draw(1), [])
+
+    def test_contents_list_operations(self):
+        hat = Hat(red=2, blue=1)
+        copied = hat.contents.copy()
+        copied.append("green")
+        self.assertEqual(hat.counts(), {"red": 2, "blue": 1})
+        self.assertEqual(hat.contents + ["green"], ["red", "red", "blue", "green"])
+        self.assertEqual(["green"] + hat.contents, ["green", "red", "red", "blue"])
+        self.assertIn("blue", hat.contents)
+        hat.contents.sort()
+        self.assertEqual(hat.contents, ["blue", "red", "red"])
+        hat.contents.sort(key=len, reverse=True)
+        self.assertEqual(hat.contents, ["blue", "red", "red"])
+        hat.contents.reverse()
+        self.assertEqual(hat.contents, ["red", "red", "blue"])
+        hat.contents += ["blue"]
+        self.assertEqual(hat.counts(), {"red": 2, "blue": 2})
+
+    def test_empty_and_negative_hats(self):
+        hat = Hat(red=3, blue=-2)
+        self.assertEqual(len(hat.contents), 3)
+        self.assertEqual(hat.counts(), {"red": 3})
+        hat.contents = []
+        self.assertEqual(experiment(hat, {}, 2, 10), 1.0)
+        self.assertEqual(experiment(hat, {"red": 1}, 2, 10), 0.0)
+        self.assertEqual(experiment_batch(hat, {}, 2, 10, seed=1), 1.0)
+
+    def test_experiment_does_not_modify_hat(self):
+        hat = Hat(blue=3, red=2, green=6)
+        experiment(hat, {"blue": 2}, 4, 100)
+        self.assertEqual(hat.counts(), {"blue": 3, "red": 2, "green": 6})
+        self.assertEqual(experiment(hat, {"yellow": 1}, 4, 100), 0.0)
+
+    def test_exact_probability(self):
+        hat = Hat(blue=3, red=2, green=6)
+        # 87 favourable draws out of C(11, 4) = 330
+        prob = exact_probability(hat, {"blue": 2, "green": 1}, 4)
+        self.assertAlmostEqual(prob, 87 / 330)
+        self.assertEqual(len(hat.contents), 11)
+
+    def test_exact_probability_edge_cases(self):
+        hat = Hat(red=2, blue=1)
+        self.assertEqual(exact_probability(hat, {"green": 1}, 2), 0.0)
+        self.assertEqual(exact_probability(hat, {"red": 2, "blue": 1}, 10), 1.0)
+        self.assertEqual(exact_probability(hat, {}, 1), 1.0)
+        with self.assertRaises(ValueError):
+            exact_probability(hat, {"red": 1}, -1)
+
+    def test_exact_probability_large_hats(self):
+        cases = [
+            (Hat(**{f"color{i}": 1000 for i in range(10)}), {f"color{i}": 250 for i in range(10)}, 3000),
+            (Hat(**{f"color{i}": 200 for i in range(40)}), {f"color{i}": 40 for i in range(40)}, 2000),
+            (Hat(**{f"color{i}": 100 + 37 * i for i in range(24)}), {f"color{i}": 3 for i in range(24)}, 500),
+        ]
+        for hat, expected, num_balls_drawn in cases:
+            with self.subTest(colors=len(expected)):
+                start = time.perf_counter()
+                probability = exact_probability(hat, expected, num_balls_drawn)
+                self.assertLess(time.perf_counter() - start, 5)
+                self.assertTrue(0 < probability < 1)
+
+    def test_exact_probability_paths_agree(self):
+        # both ways of computing the probability, on hats small enough for the exact count
+        cases = [
+            (300, 40, [(50, 3), (80, 12), (20, 1)]),
+            (1000, 600, [(400, 150), (300, 100)]),
+            (205, 5, [(2, 2), (3, 2)]),
+        ]
+        for total_balls, num_balls_drawn, constraints in cases:
+            with self.subTest(constraints=constraints):
+                favourable = probability_calculator._count_favourable_draws(total_balls, num_balls_drawn, constraints)
+                exact = favourable / math.comb(total_balls, num_balls_drawn)
+                self.assertAlmostEqual(probability_calculator._favourable_probability(total_balls, num_balls_drawn, constraints),
+                                       exact, delta=exact * 1e-12)
+
+    def test_experiment_exact_method(self):
+        hat = Hat(black=6, red=4, green=3)
+        expected = {"red": 2, "green": 1}
+        self.assertEqual(
+            experiment(hat, expected, 5, 0, method="exact"),
+            exact_probability(hat, expected, 5)
+        )
+        with self.assertRaises(ValueError):
+            experiment(hat, expected, 5, 10, method="guess")
+
+    def test_experiment_batch_reproducible(self):
+        hat = Hat(blue=3, red=2, green=6)
+        expected = {"blue": 2, "green": 1}
+        first = experiment_batch(hat, expected, 4, 5000, seed=7, chunk_size=1000)
+        second = experiment_batch(hat, expected, 4, 5000, seed=7, chunk_size=1000)
+        self.assertEqual(first, second)
+        self.assertAlmostEqual(first, 87 / 330, delta=0.05)
+
+    @unittest.skipIf(probability_calculator.numpy is None, "NumPy is not installed")
+    def test_experiment_batch_numpy(self):
+        hat = Hat(blue=30, red=20, green=60, yellow=40)
+        expected = {"blue": 3, "green": 2, "purple": 0}
+        probability = experiment_batch(hat, expected, 10, 200_000, seed=5, chunk_size=30_000)
+        self.assertAlmostEqual(probability, exact_probability(hat, expected, 10), delta=0.01)
+        self.assertEqual(experiment_batch(hat, {"blue": 31}, 200, 10, seed=5), 0.0)
+        self.assertEqual(experiment_batch(hat, {"blue": 30}, 200, 10, seed=5), 1.0)
+
+    def test_experiment_parallel_matches_batch(self):
+        hat = Hat(blue=3, red=2, green=6)
+        expected = {"blue": 2, "green": 1}
+        batch = experiment_batch(hat, expected, 4, 3000, seed=11, chunk_size=500)
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                parallel = experiment_parallel(hat, expected, 4, 3000, seed=11, chunk_size=500, workers=workers)
+                self.assertEqual(parallel, batch)
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=3)
+        self.assertAlmostEqual(high, 0.5962, places=3)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+    def test_experiment_adaptive_stops_at_precision(self):
+        hat = Hat(blue=3, red=2, green=6)
+        result = experiment_adaptive(hat, {"blue": 2, "green": 1}, 4, half_width=0.02, batch_size=200, seed=3)
+        self.assertLessEqual((result.high - result.low) / 2, 0.02)
+        self.assertLess(result.num_experiments, 1_000_000)
+        self.assertAlmostEqual(result.probability, 87 / 330, delta=0.05)
+
+    def test_experiment_adaptive_budget(self):
+        hat = Hat(blue=3, red=2, green=6)
+        result = experiment_adaptive(hat, {"blue": 2}, 4, half_width=0.0001, max_experiments=500, batch_size=200, seed=3)
+        self.assertEqual(result.num_experiments, 500)
+
+    def test_cache_reuses_and_refines(self):
+        cache = ProbabilityCache(maxsize=2)
+        first = cache.query(Hat(blue=3, red=2, green=6), {"blue": 2, "green": 1}, 4, 500)
+        # same query with the colors in another order is served from the cache
+        second = cache.query(Hat(green=6, red=2, blue=3), {"green": 1, "blue": 2}, 4, 300)
+        self.assertEqual(first, second)
+        cache.query(Hat(blue=3, red=2, green=6), {"blue": 2, "green": 1}, 4, 800)
+        key = ProbabilityCache._key(Hat(blue=3, red=2, green=6), {"blue": 2, "green": 1}, 4)
+        self.assertEqual(cache._entries[key][1], 800)
+
+    def test_cache_eviction(self):
+        cache = ProbabilityCache(maxsize=2)
+        hat = Hat(red=2, blue=2)
+        for draws in (1, 2, 3):
+            cache.query(hat, {"red": 1}, draws, 10)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(ProbabilityCache._key(hat, {"red": 1}, 1), cache._entries)
+
+    def test_cache_requires_experiments(self):
+        cache = ProbabilityCache()
+        with self.assertRaises(ValueError):
+            cache.query(Hat(red=2, blue=2), {"red": 1}, 2, 0)
+        with self.assertRaises(ValueError):
+            cache.refine(Hat(red=2, blue=2), {"red": 1}, 2, -5)
+        self.assertEqual(len(cache), 0)
+
+    def test_cache_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.json")
+            cache = ProbabilityCache(path=path)
+            probability = cache.query(Hat(red=2, blue=2), {"red": 1}, 2, 100)
+            cache.save()
+            restored = ProbabilityCache(path=path)
+            self.assertEqual(restored.query(Hat(red=2, blue=2), {"red": 1}, 2, 100), probability)
+
+    def test_experiment_importance_matches_exact(self):
+        cases = [
+            (Hat(blue=3, red=2, green=6), {"blue": 2, "green": 1}, 4),
+            (Hat(red=2, blue=3, green=200), {"red": 2, "blue": 2}, 5),
+            (Hat(a=40, b=40, c=40, d=40), {"a": 8, "b": 8, "c": 8}, 30),
+        ]
+        for hat, expected, num_balls_drawn in cases:
+            with self.subTest(expected=expected):
+                exact = exact_probability(hat, expected, num_balls_drawn)
+                result = experiment_importance(hat, expected, num_balls_drawn, 2000, seed=5)
+                self.assertEqual(result.num_experiments, 2000)
+                self.assertAlmostEqual(result.probability, exact, delta=max(5 * result.variance ** 0.5, exact * 1e-9))
+                self.assertAlmostEqual(result.probability, exact, delta=exact * 0.1)
+
+    def test_experiment_importance_rare_event(self):
+        hat = Hat(red=2, blue=3, green=200)
+        # plain Monte Carlo almost never sees this outcome
+        result = experiment_importance(hat, {"red": 2, "blue": 2}, 5, 100, seed=1)
+        self.assertGreater(result.probability, 0)
+        self.assertAlmostEqual(result.probability, exact_probability(hat, {"red": 2, "blue": 2}, 5))
+
+    def test_experiment_batch_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            experiment_batch(Hat(red=1), {"red": 1}, 1, 10, chunk_size=0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import time
+
+from typing import Any, Dict, Optional
+
+from is_unnatural_prime import count_unnatural_primes, is_unnatural_prime
+
+
+def benchmark_count(limit: int, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compare counting the primes and negative primes in [-limit, limit) with a loop of is_unnatural_prime calls and with count_unnatural_primes.
+
+    Parameters
+    ----------
+    limit : int
+        The bound of the range.
+    max_workers : int, optional
+        The largest number of processes to try (default is the number of CPUs).
+
+    Returns
+    -------
+    Dict[str, Any]
+        The seconds spent by the loop and by count_unnatural_primes for each number of workers.
+    """
+    start = time.perf_counter()
+    expected = sum(is_unnatural_prime(n) for n in range(-limit, limit))
+    loop_seconds = time.perf_counter() - start
+
+    result = {'limit': limit, 'count': expected, 'loop_seconds': loop_seconds, 'segmented': []}
+    workers = 1
+    while workers <= (max_workers or os.cpu_count() or 1):
+        start = time.perf_counter()
+        count = count_unnatural_primes(-limit, limit, workers=workers)
+        elapsed = time.perf_counter() - start
+        if count != expected:
+            raise AssertionError(f'count_unnatural_primes returned {count} instead of {expected}')
+        result['segmented'].append({'workers': workers, 'seconds': elapsed, 'speedup_over_loop': loop_seconds / elapsed})
+        workers *= 2
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the range APIs against the per-call loop and print the results as JSON.')
+    parser.add_argument('--limits', type=int, nargs='+', default=[10 ** 5, 10 ** 6])
+    parser.add_argument('--max-workers', type=int)
+    args = parser.parse_args()
+
+    print(json.dumps([benchmark_count(limit, args.max_workers) for limit in args.limits], indent=2))
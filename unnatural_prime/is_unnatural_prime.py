@@ -1,4 +1,229 @@
+import bisect
+import collections
+import concurrent.futures
+import itertools
 import math
+import mmap
+import os
+import random
+import struct
+
+from collections.abc import Callable, Iterable, Iterator
+from typing import Optional
+
+# largest prime that factorize divides by before using Pollard's rho
+_FACTOR_TRIAL_LIMIT = 1 << 12
+
+# largest square root of the values that classify_unnatural_primes sieves
+_SIEVE_ROOT_LIMIT = 1 << 20
+
+# primes found so far by _primes_up_to, and the bound they were sieved up to
+_small_primes = [2, 3, 5, 7]
+_small_primes_limit = 10
+
+
+def _primes_up_to(limit: int) -> list[int]:
+    """
+    Return the primes up to limit, sieving them only the first time they are needed.
+
+    Parameters
+    ----------
+    limit : int
+        The largest number to consider.
+
+    Returns
+    -------
+    list[int]
+        The primes less than or equal to limit, in increasing order.
+    """
+    global _small_primes, _small_primes_limit
+
+    if limit > _small_primes_limit:
+        sieve = bytearray([1]) * (limit + 1)
+        sieve[:2] = b'\x00\x00'
+        for p in range(2, math.isqrt(limit) + 1):
+            if sieve[p]:
+                sieve[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+        _small_primes = [n for n in range(limit + 1) if sieve[n]]
+        _small_primes_limit = limit
+
+    return _small_primes[:bisect.bisect_right(_small_primes, limit)]
+
+
+# header of the files written by build_prime_bitmap: a magic string and the bound
+_BITMAP_HEADER = struct.Struct('<4sQ')
+_BITMAP_MAGIC = b'UPBM'
+
+# memory-mapped prime bitmap loaded by load_prime_bitmap, and the bound it covers
+_bitmap = None
+_bitmap_bound = 0
+
+# primes used for trial division before the probabilistic tests
+_TRIAL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71,
+                 73, 79, 83, 89, 97, 101, 103, 107, 109, 113, 127, 131, 137, 139, 149, 151, 157,
+                 163, 167, 173, 179, 181, 191, 193, 197, 199)
+
+# Miller-Rabin bases that give an exact answer for every number below 2**64
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _is_strong_probable_prime(n: int, base: int) -> bool:
+    """
+    Run the Miller-Rabin test of an odd number n > 2 to a given base.
+
+    Parameters
+    ----------
+    n : int
+        The odd number to test.
+    base : int
+        The base of the test.
+
+    Returns
+    -------
+    bool
+        False if the base proves n composite, True otherwise.
+    """
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a: int, n: int) -> int:
+    """
+    Compute the Jacobi symbol (a/n) for an odd positive n.
+    """
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _is_strong_lucas_probable_prime(n: int) -> bool:
+    """
+    Run the strong Lucas test of an odd number n > 2, with Selfridge's parameters.
+
+    Parameters
+    ----------
+    n : int
+        The odd number to test.
+
+    Returns
+    -------
+    bool
+        False if the test proves n composite, True otherwise.
+    """
+    # the search for D below never ends for perfect squares
+    if math.isqrt(n) ** 2 == n:
+        return False
+
+    d_parameter = 5
+    while True:
+        jacobi = _jacobi(d_parameter, n)
+        if jacobi == -1:
+            break
+        if jacobi == 0 and abs(d_parameter) != n:
+            return False
+        d_parameter = -d_parameter - 2 if d_parameter > 0 else -d_parameter + 2
+    q_parameter = (1 - d_parameter) // 4
+
+    def half(x: int) -> int:
+        # x / 2 modulo the odd number n
+        x %= n
+        return (x + n) // 2 if x % 2 else x // 2
+
+    d = n + 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    # U and V are the Lucas sequences at k, starting at k = 1, and q_k is Q**k
+    u, v, q_k = 1, 1, q_parameter % n
+    for bit in bin(d)[3:]:
+        u, v, q_k = u * v % n, (v * v - 2 * q_k) % n, q_k * q_k % n
+        if bit == '1':
+            u, v, q_k = half(u + v), half(d_parameter * u + v), q_k * q_parameter % n
+
+    if u == 0 or v == 0:
+        return True
+    for _ in range(s - 1):
+        v, q_k = (v * v - 2 * q_k) % n, q_k * q_k % n
+        if v == 0:
+            return True
+    return False
+
+
+def _is_prime(n: int) -> bool:
+    """
+    Determine if a non-negative integer is prime.
+
+    Parameters
+    ----------
+    n : int
+        The non-negative integer to be evaluated.
+
+    Returns
+    -------
+    bool
+        True if n is prime, False otherwise.
+    """
+    if n < 2:
+        return False
+    for p in _TRIAL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < _TRIAL_PRIMES[-1] ** 2:
+        return True
+
+    if n < 1 << 64:
+        return all(_is_strong_probable_prime(n, base) for base in _MILLER_RABIN_BASES)
+
+    # Baillie-PSW: no composite is known to pass both tests
+    return _is_strong_probable_prime(n, 2) and _is_strong_lucas_probable_prime(n)
+
+
+def _sieve_segment(low: int, high: int) -> bytearray:
+    """
+    Mark the primes in the range [low, high) with a segmented Sieve of Eratosthenes.
+
+    Parameters
+    ----------
+    low : int
+        The first number of the segment (non-negative).
+    high : int
+        The number after the last one of the segment.
+
+    Returns
+    -------
+    bytearray
+        One byte per number of the segment, 1 for primes and 0 otherwise.
+    """
+    segment = bytearray([1]) * (high - low)
+    for n in range(low, min(high, 2)):
+        segment[n - low] = 0
+    for p in _primes_up_to(math.isqrt(high - 1) if high > 1 else 0):
+        start = max(p * p, (low + p - 1) // p * p)
+        segment[start - low::p] = bytes(len(range(start, high, p)))
+    return segment
 
 def is_unnatural_prime(n: int) -> bool:
     """
@@ -6,6 +231,10 @@ def is_unnatural_prime(n: int) -> bool:
     
     It is part of a Daily Coding Challenge from freeCodeCamp.
 
+    Small factors are ruled out by trial division, then the number is tested with a
+    deterministic Miller-Rabin test below 2**64 and with Baillie-PSW above, so even
+    very large inputs are answered in microseconds.
+
     Parameters:
     ----------
     n : int
@@ -33,9 +262,629 @@ def is_unnatural_prime(n: int) -> bool:
     if n_abs < 2:
         return False
 
-    # going through all the possible divisors
-    for divisor in range(2, math.isqrt(n_abs) + 1):
-        if n_abs % divisor == 0:
-            return False
-            
-    return True
\ No newline at end of file
+    # a single bit lookup when a prime bitmap covering n is loaded
+    if n_abs < _bitmap_bound:
+        if n_abs % 2 == 0:
+            return n_abs == 2
+        bit = n_abs // 2
+        return bool(_bitmap[_BITMAP_HEADER.size + bit // 8] >> (bit % 8) & 1)
+
+    return _is_prime(n_abs)
+
+
+def classify_unnatural_primes(values: Iterable[int], segment_size: int = 1 << 20) -> bytearray:
+    """
+    Determine for many integers at once whether each one is a prime or a negative prime.
+
+    When the absolute values are dense (their range is not much larger than their
+    number, and their square roots are small compared with it) they are classified
+    with a segmented Sieve of Eratosthenes over that range. Otherwise each value is
+    tested like is_unnatural_prime, by trial division with a few small primes
+    followed by Miller-Rabin or Baillie-PSW. A bitmap loaded with load_prime_bitmap
+    is not used.
+
+    Parameters
+    ----------
+    values : iterable of int
+        The integers to be evaluated.
+    segment_size : int, optional
+        The length of each segment of the sieve (default is 2**20).
+
+    Returns
+    -------
+    bytearray
+        One byte per value, 1 if it is a prime or a negative prime and 0 otherwise.
+
+    Raises
+    ------
+    TypeError
+        If any value is not an integer.
+    """
+    absolute = []
+    for n in values:
+        if not isinstance(n, int):
+            raise TypeError("n must be an integer")
+        absolute.append(abs(n))
+
+    result = bytearray(len(absolute))
+    if not absolute:
+        return result
+
+    low, high = min(absolute), max(absolute) + 1
+
+    # sieving needs the primes up to the square root of the largest value, which only
+    # pays off when there are at least as many values as such primes to sieve with
+    root = math.isqrt(high - 1)
+    if high - low <= 4 * len(absolute) and root <= min(len(absolute), _SIEVE_ROOT_LIMIT):
+        # dense values: sieve the segments that contain values and read them as each one is made
+        order = sorted(range(len(absolute)), key=absolute.__getitem__)
+        position = 0
+        while position < len(order):
+            start = absolute[order[position]]
+            stop = min(start + segment_size, high)
+            segment = _sieve_segment(start, stop)
+            while position < len(order) and absolute[order[position]] < stop:
+                i = order[position]
+                result[i] = segment[absolute[i] - start]
+                position += 1
+        return result
+
+    # sparse values: the same tests as is_unnatural_prime, one value at a time
+    for i, n in enumerate(absolute):
+        result[i] = _is_prime(n)
+    return result
+
+
+
+def build_prime_bitmap(path: str, bound: int, segment_size: int = 1 << 24) -> None:
+    """
+    Write a file marking which odd numbers below a bound are prime.
+
+    Bit i of the file (after a small header) is set when 2 * i + 1 is prime. The
+    file is built one sieve segment at a time, so the memory used does not depend
+    on the bound.
+
+    Parameters
+    ----------
+    path : str
+        The file to write.
+    bound : int
+        The numbers below this bound are included.
+    segment_size : int, optional
+        The number of integers sieved at a time (default is 2**24).
+    """
+    # every segment holds a whole number of bytes of odd numbers
+    segment_size = max(16, segment_size - segment_size % 16)
+    bound = max(0, bound)
+    with open(path, 'wb') as file:
+        file.write(_BITMAP_HEADER.pack(_BITMAP_MAGIC, bound))
+        for low in range(0, bound, segment_size):
+            odd_flags = _sieve_segment(low, low + segment_size)[1::2]
+            length = len(odd_flags) // 8
+            # every flag is 0 or 1, so shifting the k-th flag of each byte by k packs eight of them without carries
+            packed = 0
+            for k in range(8):
+                packed |= int.from_bytes(odd_flags[k::8], 'big') << k
+            bits = bytearray(packed.to_bytes(length, 'big'))
+
+            # keep only the odd numbers below the bound in the last segment
+            count = (min(bound, low + segment_size) - low) // 2
+            del bits[(count + 7) // 8:]
+            if count % 8:
+                bits[-1] &= (1 << (count % 8)) - 1
+            file.write(bits)
+
+
+def load_prime_bitmap(path: str) -> None:
+    """
+    Memory-map a file written by build_prime_bitmap, so is_unnatural_prime answers with a bit lookup below its bound.
+
+    The file is mapped read-only, so every process that loads it shares the same pages of memory.
+
+    Parameters
+    ----------
+    path : str
+        The file to load.
+
+    Raises
+    ------
+    ValueError
+        If the file was not written by build_prime_bitmap.
+    """
+    global _bitmap, _bitmap_bound
+
+    with open(path, 'rb') as file:
+        bitmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(bitmap) < _BITMAP_HEADER.size:
+        bitmap.close()
+        raise ValueError('the file is not a prime bitmap')
+    magic, bound = _BITMAP_HEADER.unpack_from(bitmap)
+    if magic != _BITMAP_MAGIC or len(bitmap) < _BITMAP_HEADER.size + (bound // 2 + 7) // 8:
+        bitmap.close()
+        raise ValueError('the file is not a prime bitmap')
+
+    unload_prime_bitmap()
+    _bitmap, _bitmap_bound = bitmap, bound
+
+
+def unload_prime_bitmap() -> None:
+    """
+    Stop using the prime bitmap loaded by load_prime_bitmap, if any.
+    """
+    global _bitmap, _bitmap_bound
+
+    if _bitmap is not None:
+        _bitmap_bound = 0
+        _bitmap.close()
+        _bitmap = None
+
+
+def _count_segment(low: int, high: int) -> int:
+    """
+    Count the primes in the range [low, high) of non-negative integers.
+    """
+    return _sieve_segment(low, high).count(1)
+
+
+def _primes_in_segment(low: int, high: int) -> list[int]:
+    """
+    List the primes in the range [low, high) of non-negative integers.
+    """
+    segment = _sieve_segment(low, high)
+    return [low + i for i in itertools.compress(range(len(segment)), segment)]
+
+
+def _map_segments(function: Callable[[int, int], object], segments: Iterable[tuple[int, int]], workers: Optional[int]) -> Iterator:
+    """
+    Apply function to every segment on a pool of processes, yielding the results in order.
+
+    Only a few segments per worker are submitted at a time, so the results are
+    streamed and the memory used does not depend on the number of segments.
+
+    Parameters
+    ----------
+    function : callable
+        The function called with the bounds of each segment.
+    segments : iterable of tuple[int, int]
+        The bounds of the segments.
+    workers : int, optional
+        The number of processes to use (default is the number of CPUs). With 1 the
+        segments are processed in the current process.
+
+    Yields
+    ------
+    object
+        The result of function for each segment, in the order of the segments.
+    """
+    segments = iter(segments)
+    if workers == 1:
+        for low, high in segments:
+            yield function(low, high)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    window = 4 * workers
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for low, high in segments:
+            pending.append(executor.submit(function, low, high))
+            if len(pending) >= window:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def _split(low: int, high: int, segment_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Split the range [low, high) into consecutive segments of at most segment_size integers.
+    """
+    for start in range(low, high, segment_size):
+        yield start, min(start + segment_size, high)
+
+
+def count_unnatural_primes(start: int, stop: int, segment_size: int = 1 << 22, workers: Optional[int] = None) -> int:
+    """
+    Count the primes and negative primes in the range [start, stop).
+
+    The negative part of the range is counted as the primes of its absolute values,
+    so the absolute values shared by both parts are sieved only once. The range is
+    split into segments that are sieved on a pool of processes.
+
+    Parameters
+    ----------
+    start : int
+        The first integer of the range.
+    stop : int
+        The integer after the last one of the range.
+    segment_size : int, optional
+        The number of integers sieved by each task (default is 2**22).
+    workers : int, optional
+        The number of processes to use (default is the number of CPUs).
+
+    Returns
+    -------
+    int
+        The number of primes and negative primes in the range.
+    """
+    # the absolute values of the non-negative and of the negative part of the range
+    parts = [(max(start, 0), stop), (max(1 - stop, 0), 1 - start)]
+    parts = [(low, high) for low, high in parts if low < high]
+
+    # split them at every bound, counting each piece once and weighting it by how many parts cover it
+    bounds = sorted({bound for part in parts for bound in part})
+    pieces = []
+    for low, high in zip(bounds, bounds[1:]):
+        weight = sum(part_low <= low and high <= part_high for part_low, part_high in parts)
+        if weight:
+            pieces.append((low, high, weight))
+
+    segments = [(segment, weight) for low, high, weight in pieces for segment in _split(low, high, segment_size)]
+    counts = _map_segments(_count_segment, (segment for segment, _ in segments), workers)
+    return sum(count * weight for count, (_, weight) in zip(counts, segments))
+
+
+def iter_unnatural_primes(start: int, stop: int, segment_size: int = 1 << 22, workers: Optional[int] = None) -> Iterator[int]:
+    """
+    Iterate in increasing order over the primes and negative primes in the range [start, stop).
+
+    The range is split into segments that are sieved on a pool of processes, and
+    the results are streamed back in order as the segments are completed.
+
+    Parameters
+    ----------
+    start : int
+        The first integer of the range.
+    stop : int
+        The integer after the last one of the range.
+    segment_size : int, optional
+        The number of integers sieved by each task (default is 2**22).
+    workers : int, optional
+        The number of processes to use (default is the number of CPUs).
+
+    Yields
+    ------
+    int
+        The primes and negative primes of the range, from the smallest.
+    """
+    # negative values, from the largest absolute value down
+    negative_low, negative_high = max(1 - stop, 0), 1 - start
+    negative_segments = [(max(high - segment_size, negative_low), high)
+                         for high in range(negative_high, negative_low, -segment_size)]
+    positive_segments = _split(max(start, 0), stop, segment_size)
+
+    def tasks() -> Iterator[tuple[int, int]]:
+        yield from negative_segments
+        yield from positive_segments
+
+    results = _map_segments(_primes_in_segment, tasks(), workers)
+    for primes in itertools.islice(results, len(negative_segments)):
+        for p in reversed(primes):
+            yield -p
+    for primes in results:
+        yield from primes
+
+
+class PrimalityCache:
+    """
+    Bounded cache of is_unnatural_prime results, keyed on the absolute value of n.
+
+    A number and its negation share the same entry. When the cache is full the
+    least recently used entry is removed.
+
+    Attributes
+    ----------
+    capacity : int
+        The largest number of entries kept.
+    hits : int
+        The number of calls answered from the cache.
+    misses : int
+        The number of calls that had to run is_unnatural_prime.
+    evictions : int
+        The number of entries removed to make room for new ones.
+    """
+    def __init__(self, capacity: int = 4096) -> None:
+        """
+        Initialize a new PrimalityCache.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            The largest number of entries kept (default is 4096).
+
+        Raises
+        ------
+        ValueError
+            If capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Return the number of cached entries.
+        """
+        return len(self._entries)
+
+    def __call__(self, n: int) -> bool:
+        """
+        Determine if n is a prime number or a negative prime number, using the cache.
+
+        Parameters
+        ----------
+        n : int
+            The integer to be evaluated as a prime or negative prime.
+
+        Returns
+        -------
+        bool
+            True if n is a prime number or a negative prime number, False otherwise.
+
+        Raises
+        ------
+        TypeError
+            If n is not an integer.
+        """
+        if not isinstance(n, int):
+            raise TypeError("n must be an integer")
+
+        key = abs(n)
+        result = self._entries.get(key)
+        if result is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return result
+
+        self.misses += 1
+        result = is_unnatural_prime(key)
+        self._store(key, result)
+        return result
+
+    def _store(self, key: int, result: bool) -> None:
+        """
+        Save an entry as the most recently used one, removing the oldest if the cache is full.
+        """
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        float: The fraction of calls answered from the cache (0 before the first call).
+        """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def warm(self, path: str) -> int:
+        """
+        Fill the cache with the values of a file, without counting them as hits or misses.
+
+        Parameters
+        ----------
+        path : str
+            A text file with one integer per line. Blank lines are ignored.
+
+        Returns
+        -------
+        int
+            The number of values read.
+        """
+        count = 0
+        with open(path) as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                key = abs(int(line))
+                self._store(key, is_unnatural_prime(key))
+                count += 1
+        return count
+
+    def clear(self) -> None:
+        """
+        Remove every entry and reset the counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def _perfect_power(n: int) -> tuple[int, int]:
+    """
+    Write n > 1 as root ** exponent with the largest possible exponent.
+
+    Parameters
+    ----------
+    n : int
+        The integer to decompose.
+
+    Returns
+    -------
+    tuple[int, int]
+        The root and the exponent; the exponent is 1 if n is not a perfect power.
+    """
+    for exponent in range(n.bit_length(), 1, -1):
+        # A float root is only exact to within one while n fits in about twice the 53 bits of a double.
+        root = round(n ** (1 / exponent)) if n.bit_length() <= 100 else _integer_root(n, exponent)
+        for candidate in (root - 1, root, root + 1):
+            if candidate > 1 and candidate ** exponent == n:
+                return candidate, exponent
+    return n, 1
+
+
+def _integer_root(n: int, exponent: int) -> int:
+    """
+    Compute the integer part of the exponent-th root of n with Newton's method.
+    """
+    root = 1 << -(-n.bit_length() // exponent)
+    while True:
+        following = ((exponent - 1) * root + n // root ** (exponent - 1)) // exponent
+        if following >= root:
+            return root
+        root = following
+
+
+def _pollard_brent(n: int) -> int:
+    """
+    Find a non-trivial factor of an odd composite number with Brent's variant of Pollard's rho.
+
+    Parameters
+    ----------
+    n : int
+        The odd composite number to split.
+
+    Returns
+    -------
+    int
+        A factor of n between 2 and n - 1.
+    """
+    rng = random.Random(n)
+    while True:
+        y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+        g, r, q = 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                saved = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+
+        # the batched gcd overshot: step back one value at a time
+        if g == n:
+            g = 1
+            while g == 1:
+                saved = (saved * saved + c) % n
+                g = math.gcd(abs(x - saved), n)
+        if g != n:
+            return g
+
+
+def factorize(n: int) -> dict[int, int]:
+    """
+    Find the prime factorization of the absolute value of an integer.
+
+    Small factors are removed by trial division with the table of small primes
+    shared with the primality tests, and the remaining part is split with Pollard's
+    rho (Brent's variant) until every factor passes the primality test.
+
+    Parameters
+    ----------
+    n : int
+        The integer to factorize; n and -n have the same factorization.
+
+    Returns
+    -------
+    dict[int, int]
+        A dictionary with the prime factors as keys, in increasing order, and their exponents as values.
+        It is empty for 1 and -1.
+
+    Raises
+    ------
+    TypeError
+        If n is not an integer.
+    ValueError
+        If n is 0.
+    """
+    if not isinstance(n, int):
+        raise TypeError("n must be an integer")
+    if n == 0:
+        raise ValueError("0 has no prime factorization")
+
+    n = abs(n)
+    factors = {}
+    for p in _primes_up_to(_FACTOR_TRIAL_LIMIT):
+        if p * p > n:
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    pending = [n] if n > 1 else []
+    while pending:
+        m = pending.pop()
+        if _is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+
+        # Pollard's rho needs about sqrt(p) steps to find p, far too many for powers of a large prime
+        root, exponent = _perfect_power(m)
+        if exponent > 1:
+            pending += [root] * exponent
+        else:
+            divisor = _pollard_brent(m)
+            pending += [divisor, m // divisor]
+
+    return dict(sorted(factors.items()))
+
+
+def _factorize_segment(low: int, high: int) -> list[dict[int, int]]:
+    """
+    Factorize every integer of the range [low, high) of positive integers with a sieve.
+
+    Every prime up to the square root of high is divided out of its multiples in the
+    range, and what is left of each integer is a prime factor or 1.
+    """
+    remaining = list(range(low, high))
+    factors = [{} for _ in remaining]
+    for p in _primes_up_to(math.isqrt(high - 1)):
+        for i in range((low + p - 1) // p * p - low, high - low, p):
+            exponent = 0
+            while remaining[i] % p == 0:
+                remaining[i] //= p
+                exponent += 1
+            factors[i][p] = exponent
+    for i, rest in enumerate(remaining):
+        if rest > 1:
+            factors[i][rest] = 1
+    return factors
+
+
+def factorize_range(start: int, stop: int, segment_size: int = 1 << 16) -> Iterator[tuple[int, dict[int, int]]]:
+    """
+    Factorize every non-zero integer of the range [start, stop) in increasing order.
+
+    The absolute values are factorized together, one segment at a time, by dividing
+    the small primes out of their multiples as in a sieve, which is much faster than
+    factorizing each integer on its own when the range is dense.
+
+    Parameters
+    ----------
+    start : int
+        The first integer of the range.
+    stop : int
+        The integer after the last one of the range.
+    segment_size : int, optional
+        The number of integers factorized together (default is 2**16).
+
+    Yields
+    ------
+    tuple[int, dict[int, int]]
+        Each integer of the range, except 0, with its factorization as returned by factorize.
+    """
+    # negative values, from the largest absolute value down
+    negative_low, negative_high = max(1 - stop, 1), 1 - start
+    for high in range(negative_high, negative_low, -segment_size):
+        low = max(high - segment_size, negative_low)
+        factors = _factorize_segment(low, high)
+        for offset in range(high - low - 1, -1, -1):
+            yield -(low + offset), factors[offset]
+
+    for low, high in _split(max(start, 1), stop, segment_size):
+        for offset, factors in enumerate(_factorize_segment(low, high)):
+            yield low + offset, factors
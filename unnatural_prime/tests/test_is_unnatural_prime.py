@@ -1,5 +1,7 @@
+import os
+import tempfile
 import unittest
-from is_unnatural_prime import is_unnatural_prime
+from is_unnatural_prime import PrimalityCache, build_prime_bitmap, classify_unnatural_primes, count_unnatural_primes, factorize, factorize_range, is_unnatural_prime, iter_unnatural_primes, load_prime_bitmap, unload_prime_bitmap
 
 class TestUnnaturalPrime(unittest.TestCase):
 
@@ -19,6 +21,122 @@ class TestUnnaturalPrime(unittest.TestCase):
         with self.assertRaises(TypeError):
             is_unnatural_prime(3.5)
 
+    def test_large_primes(self):
+        primes = [2 ** 61 - 1, -(2 ** 64 - 59), 2 ** 64 + 13, -(2 ** 89 - 1), 2 ** 127 - 1]
+        for n in primes:
+            with self.subTest(n=n):
+                self.assertTrue(is_unnatural_prime(n))
+
+    def test_large_composites(self):
+        # strong pseudoprimes to the first bases, a Carmichael number and products of large primes
+        composites = [2047, 561, 3215031751, -3825123056546413051, 2 ** 67 - 1, (2 ** 61 - 1) * (2 ** 89 - 1), (2 ** 64 + 13) ** 2]
+        for n in composites:
+            with self.subTest(n=n):
+                self.assertFalse(is_unnatural_prime(n))
+
+    def test_prime_bitmap(self):
+        expected = [is_unnatural_prime(n) for n in range(-1200, 1200)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "primes.bin")
+            build_prime_bitmap(path, 1001, segment_size=64)
+            load_prime_bitmap(path)
+            try:
+                # values above the bound go through the usual tests
+                self.assertEqual([is_unnatural_prime(n) for n in range(-1200, 1200)], expected)
+                self.assertTrue(is_unnatural_prime(2 ** 61 - 1))
+            finally:
+                unload_prime_bitmap()
+
+    def test_prime_bitmap_invalid_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "primes.bin")
+            with open(path, "wb") as file:
+                file.write(b"not a bitmap at all")
+            with self.assertRaises(ValueError):
+                load_prime_bitmap(path)
+
+    def test_count_unnatural_primes(self):
+        ranges = [(-100, 100), (-50, 10), (20, 97), (-97, -20), (5, 5), (10, -10)]
+        for start, stop in ranges:
+            with self.subTest(start=start, stop=stop):
+                expected = sum(is_unnatural_prime(n) for n in range(start, stop))
+                self.assertEqual(count_unnatural_primes(start, stop, segment_size=16, workers=1), expected)
+        self.assertEqual(count_unnatural_primes(-1000, 1000, segment_size=100, workers=2), 336)
+
+    def test_iter_unnatural_primes(self):
+        expected = [n for n in range(-60, 45) if is_unnatural_prime(n)]
+        self.assertEqual(list(iter_unnatural_primes(-60, 45, segment_size=16, workers=1)), expected)
+        self.assertEqual(list(iter_unnatural_primes(-60, 45, segment_size=16, workers=2)), expected)
+
+    def test_primality_cache(self):
+        cache = PrimalityCache(capacity=2)
+        self.assertTrue(cache(19))
+        self.assertTrue(cache(-19))
+        self.assertFalse(cache(99))
+        self.assertFalse(cache(-44))
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 3, 1))
+        self.assertEqual(len(cache), 2)
+        self.assertAlmostEqual(cache.hit_rate, 0.25)
+        with self.assertRaises(TypeError):
+            cache(3.5)
+
+    def test_primality_cache_warm(self):
+        cache = PrimalityCache()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "values.txt")
+            with open(path, "w") as file:
+                file.write("97\n-61\n\n100\n")
+            self.assertEqual(cache.warm(path), 3)
+        self.assertTrue(cache(-97))
+        self.assertFalse(cache(-100))
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_factorize(self):
+        cases = {
+            -44: {2: 2, 11: 1},
+            97: {97: 1},
+            -1: {},
+            2 ** 67 - 1: {193707721: 1, 761838257287: 1},
+            (2 ** 61 - 1) ** 2 * 3: {3: 1, 2 ** 61 - 1: 2},
+            (10 ** 18 + 9) ** 2: {10 ** 18 + 9: 2},
+            (2 ** 89 - 1) ** 3: {2 ** 89 - 1: 3},
+        }
+        for n, expected in cases.items():
+            with self.subTest(n=n):
+                self.assertEqual(factorize(n), expected)
+
+    def test_factorize_errors(self):
+        with self.assertRaises(ValueError):
+            factorize(0)
+        with self.assertRaises(TypeError):
+            factorize(3.5)
+
+    def test_factorize_range(self):
+        expected = [(n, factorize(n)) for n in range(-150, 120) if n != 0]
+        self.assertEqual(list(factorize_range(-150, 120, segment_size=17)), expected)
+
+    def test_classify_dense(self):
+        values = list(range(-200, 201))
+        expected = bytearray(is_unnatural_prime(n) for n in values)
+        self.assertEqual(classify_unnatural_primes(values, segment_size=37), expected)
+        values = [10 ** 7 + 19, 10 ** 7 + 5, -(10 ** 7 + 79)] * 2000 + [10 ** 7 + 3]
+        expected = bytearray(is_unnatural_prime(n) for n in values)
+        self.assertEqual(classify_unnatural_primes(values, segment_size=16), expected)
+
+    def test_classify_large_neighbours(self):
+        values = [10 ** 16 + 61, 10 ** 16 + 62]
+        self.assertEqual(classify_unnatural_primes(values), bytearray([1, 0]))
+
+    def test_classify_sparse(self):
+        values = [19, -23, 97, -61, 0, 1, -1, 99, -44, 1000003, -999983 * 3, 2 ** 31 - 1]
+        expected = bytearray(is_unnatural_prime(n) for n in values)
+        self.assertEqual(classify_unnatural_primes(values), expected)
+
+    def test_classify_empty_and_type_error(self):
+        self.assertEqual(classify_unnatural_primes([]), bytearray())
+        with self.assertRaises(TypeError):
+            classify_unnatural_primes([3, 3.5])
+
 
 
 